@@ -1 +1,2 @@
-from .complexpy import *  # noqa
\ No newline at end of file
+from ._version import __version__  # noqa
+from .complexpy import *  # noqa
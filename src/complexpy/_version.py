@@ -0,0 +1,2 @@
+# version of complexpy; keep in sync with pyproject.toml (part of the result cache keys)
+__version__ = '0.1.0'
@@ -0,0 +1,309 @@
+"""
+Content-addressed on-disk cache for the results of measure functions.
+
+Results are keyed by a SHA-256 hash of the function name, the bytes of all input
+arrays and all (default-filled) parameters, so identical calls in repeated sweeps
+are read from disk instead of being recomputed. Entries are pickle files in one
+directory; when the directory exceeds its size limit, the least recently used
+entries are removed.
+
+Functions are hashed by name, not by code. The keys include the complexpy version
+and the cache format, so results of complexpy's own measures are recomputed after
+an upgrade; user-defined measures need an explicit version (CachedMeasure,
+ResultCache.wrap()) that is changed together with their code.
+
+Classes:
+  ResultCache - on-disk result store with a size limit and LRU eviction
+  CachedMeasure - measure function whose results are looked up in a ResultCache
+
+Functions:
+  cache_key - hash of a function call
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import uuid
+from collections.abc import Iterator
+from functools import partial
+
+import numpy as np
+
+from ._version import __version__
+from .gaussian import GaussianStats
+
+# version of the key and entry format; changing it invalidates all entries
+_CACHE_FORMAT = 1
+
+# stored values may be None, so cache misses are signalled by a sentinel
+_missing = object()
+
+
+def _update_hash(h, obj):
+    # feed a canonical byte representation of obj into the hash h
+    if isinstance(obj, np.ndarray):
+        obj = np.ascontiguousarray(obj)
+        h.update(f'ndarray{obj.dtype.str}{obj.shape}'.encode())
+        h.update(obj.data if obj.dtype != object else pickle.dumps(obj.tolist()))
+    elif isinstance(obj, dict):
+        h.update(b'dict')
+        for key in sorted(obj, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f'{type(obj).__name__}{len(obj)}'.encode())
+        for item in obj:
+            _update_hash(h, item)
+    elif isinstance(obj, partial):
+        h.update(b'partial')
+        _update_hash(h, obj.func)
+        _update_hash(h, obj.args)
+        _update_hash(h, obj.keywords)
+    elif isinstance(obj, CachedMeasure):
+        _update_hash(h, obj.func)
+        _update_hash(h, obj.version)
+    elif isinstance(obj, os.PathLike) or (isinstance(obj, str) and obj.endswith('.npy')
+                                          and os.path.isfile(obj)):
+        # time-series given as a .npy file (see complexpy.phiid_wpe()): the file may be
+        # overwritten under the same name, so its size and modification time are hashed too
+        path = os.path.abspath(os.fspath(obj))
+        try:
+            stat = os.stat(path)
+            h.update(f'file{path}{stat.st_size}{stat.st_mtime_ns}'.encode())
+        except FileNotFoundError:
+            h.update(f'file{path}'.encode())
+    elif isinstance(obj, GaussianStats):
+        # derived from the time-series, which are hashed themselves
+        h.update(b'GaussianStats')
+    elif callable(obj) and hasattr(obj, '__qualname__'):
+        h.update(f'function{obj.__module__}.{obj.__qualname__}'.encode())
+    else:
+        h.update(f'{type(obj).__name__}{obj!r}'.encode())
+    h.update(b';')
+
+
+def _has_iterator(obj):
+    # whether obj is, or contains in its dicts, lists and tuples, an iterator
+    if isinstance(obj, Iterator):
+        return True
+    if isinstance(obj, dict):
+        return any(_has_iterator(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_iterator(item) for item in obj)
+    return False
+
+
+def cache_key(func, *args, **kwargs):
+    """
+    Purpose : Hash a function call from the bytes of its inputs and its parameters.
+
+    Parameters are bound to the signature of func and completed with their
+    defaults, so that e.g. f(x) and f(x, time_lag_for_measure=1) share a key. The
+    key also depends on the complexpy version and the cache format.
+
+    Parameters
+    ----------
+    func : function
+        Measure function.
+    *args, **kwargs
+        Arguments of the call.
+
+    Returns
+    -------
+    key : string
+        Hexadecimal SHA-256 digest.
+
+    """
+
+    return _call_key(func, args, kwargs)
+
+
+def _call_key(func, args, kwargs, version=None):
+    # cache_key() of func(*args, **kwargs), salted with the version of func
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        args, kwargs = bound.args, bound.kwargs
+    except (TypeError, ValueError):
+        pass
+
+    h = hashlib.sha256()
+    _update_hash(h, ('complexpy', __version__, _CACHE_FORMAT, version))
+    _update_hash(h, func)
+    _update_hash(h, args)
+    _update_hash(h, kwargs)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Purpose : On-disk result store with a size limit and least-recently-used eviction.
+
+    Parameters
+    ----------
+    directory : string
+        Directory of the cache entries; created if it does not exist. Several
+        processes may share one directory.
+    max_bytes : integer, optional
+        Size limit of all entries together. The default is 1 GB.
+
+    """
+
+    _suffix = '.pkl'
+
+    def __init__(self, directory, max_bytes=2**30):
+        if max_bytes <= 0:
+            raise ValueError('max_bytes is not positive')
+
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self._suffix)
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self._suffix):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # removed by another process
+                        continue
+                    entries.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        return entries
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key, default=None):
+        """
+        Purpose : Return the entry for key (and mark it as recently used), or default.
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return default
+
+        try:
+            # the modification time serves as the time of last use
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Purpose : Store value under key, evicting least recently used entries if needed.
+        """
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # write to a temporary file first so that readers never see partial entries
+        tmp_path = os.path.join(self.directory, f'.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            # an overwritten entry no longer counts
+            self._size -= os.path.getsize(self._path(key))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, self._path(key))
+
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        # recount (other processes may share the directory) and delete the oldest entries
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self):
+        """
+        Purpose : Remove all entries.
+        """
+
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+    def __len__(self):
+        return len(self._entries())
+
+    def wrap(self, func, version=None):
+        """
+        Purpose : Return func with its results cached in this ResultCache (see CachedMeasure).
+        """
+
+        return CachedMeasure(func, self, version=version)
+
+
+class CachedMeasure:
+    """
+    Purpose : Measure function whose results are looked up in a ResultCache.
+
+    Can replace e.g. phiid_wpe, shannon_wpe or phiid_2sources_2targets in the
+    emergence_functions of compute_emergence(), also with n_jobs > 1. Time-series 
+    given as .npy files are keyed by path, size and modification time; calls with 
+    time-series given as iterators of chunks are computed, not cached.
+
+    Parameters
+    ----------
+    func : function
+        Measure function; its results must be picklable.
+    cache : ResultCache
+        Where results are stored.
+    version : string or integer, optional
+        Version of func, part of the keys. Functions are hashed by name, not by code,
+        so a user-defined measure needs a new version whenever its code changes;
+        complexpy's own measures are covered by the complexpy version. The default
+        is None.
+
+    """
+
+    def __init__(self, func, cache, version=None):
+        self.func = func
+        self.cache = cache
+        self.version = version
+        self.__name__ = getattr(func, '__name__', type(func).__name__)
+        self.__doc__ = getattr(func, '__doc__', None)
+
+    def __call__(self, *args, **kwargs):
+        if _has_iterator(args) or _has_iterator(kwargs):
+            # time-series given as iterators of chunks are consumed by the call and cannot 
+            # be hashed, so such calls are not cached
+            return self.func(*args, **kwargs)
+
+        key = _call_key(self.func, args, kwargs, version=self.version)
+        result = self.cache.get(key, _missing)
+        if result is _missing:
+            result = self.func(*args, **kwargs)
+            self.cache.put(key, result)
+        return result
+
+    def __getstate__(self):
+        return {'func': self.func, 'directory': self.cache.directory,
+                'max_bytes': self.cache.max_bytes, 'version': self.version}
+
+    def __setstate__(self, state):
+        self.__init__(state['func'], ResultCache(state['directory'], state['max_bytes']),
+                      version=state['version'])
@@ -8,44 +8,95 @@ Functions:
 
 import os
 import numpy as np
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from itertools import product
+from multiprocessing import get_context
+from multiprocessing.util import Finalize
 import pandas as pd
-import matlab.engine
 
-# define Matlab engine
-eng = matlab.engine.start_matlab()
+from .cache import cache_key, _call_key
+from .data_simulation import generate_2node_mvar_data, _2node_mvar_data_dict, _sim_2node_mvar_batch
+from .engine import get_engine, shutdown_engine, to_matlab, from_matlab
+from .gaussian import standardize, lagged_covariance, correlation, sliding_windows, \
+    sliding_lagged_covariance, LaggedMoments, GaussianStats
+from .phiid import ATOM_NAMES, phiid_full, phiid_average, phiid_average_from_stats, phiid_local_atoms, \
+    _local_atoms_output, _finish_local_atoms
+from .phiid_discrete import phiid_full_discrete
+from .shannon import shannon_emergence, shannon_emergence_lags, shannon_emergence_windows, \
+    emergence_from_correlation, emergence_from_covariance, check_lags
 
-# Calculate absolute paths to MATLAB code directories
-_module_dir = os.path.dirname(os.path.abspath(__file__))
-_project_root = os.path.dirname(os.path.dirname(_module_dir))
-_phiid_path = os.path.join(_project_root, 'src', 'phiid')
-_shannon_wpe_path = os.path.join(_project_root, 'src', 'shannon_wpe')
-_infodynamics_jar_path = os.path.join(_phiid_path, 'infodynamics.jar')
+# computational backends for the measure functions
+_backends = ['matlab', 'numpy']
+
+# number of time-steps per chunk when reading memory-mapped time-series
+_chunk_size = 65536
+
+# maximum number of float64 values (512 MB) of model instantiations that a sweep simulates at once
+_max_batch_values = 2**26
 
 # -----------------------------------------------------------------------------
 # CAUSAL EMERGENCE (PHIID & PRACTICAL)
 # -----------------------------------------------------------------------------
 
 
-def phiid_wpe(data_dict, time_lag_for_measure=1, red_func='mmi'):
+def phiid_wpe(data_dict, time_lag_for_measure=1, red_func='mmi', backend='matlab', average_only=False,
+              window=None, stride=1, discrete=False):
     """
     Purpose : Compute PhiID-based Causal Emergence.
     
     Parameters
     ----------
     data_dict : dictionary where 'micro' is key, and float array gives values 
-        Time-series of micro variables.
+        Time-series of micro variables. With backend 'numpy', the time-series can 
+        also be the path of a .npy file, or an iterator (e.g. a generator) of 
+        D-by-T_chunk chunks; it is then read chunk by chunk, and the atoms are 
+        computed in closed form from the accumulated lagged covariance (only 
+        red_func 'mmi'), with memory independent of its length. Memory-mapped arrays 
+        are read the same way for red_func 'mmi' with backend 'numpy' and no window, 
+        and used as any array otherwise. In analytic mode, 
+        'lagged_cov' is key, and a function of time_lag_for_measure that returns the 
+        population covariance of [micro_t; micro_t+tau] gives value (see 
+        data_simulation.generate_2node_mvar_data); only red_func 'mmi' is supported then. If 'gaussian_stats' is a key (a 
+        gaussian.GaussianStats of micro, as added by compute_emergence()), red_func 
+        'mmi' with backend 'numpy' or average_only is computed in closed form from its 
+        cached covariances, entropies and MIB.
     time_lag_for_measure : integer, optional
         Time-lag in multivariate autoregressive time-series model. The default is 1.
-    red_func : string, optional
-        Redundancy function to do a PhiID. The default is 'mmi'.
+    red_func : string or list of strings, optional
+        Redundancy function to do a PhiID. For a list, see phiid_2sources_2targets(). 
+        The default is 'mmi'.
+    backend : string, optional
+        Either 'matlab' (PhiIDFull.m via the MATLAB engine) or 'numpy' (native
+        implementation in complexpy.phiid). The default is 'matlab'.
+    average_only : bool, optional
+        If True, compute the average atoms in closed form from the lagged covariance
+        (native, only for red_func 'mmi'); the cost does not grow with the number of
+        time-steps. The default is False.
+    window : integer, optional
+        If given, compute the measures in sliding windows of window time-steps 
+        (time-resolved emergence). For red_func 'mmi' with backend 'numpy' (or 
+        average_only), the lagged covariance is updated incrementally as the window 
+        slides, and the atoms of each window are computed in closed form; otherwise 
+        each window is computed separately. The default is None (one value for the 
+        whole time-series).
+    stride : integer, optional
+        Number of time-steps between the starts of consecutive windows. The default 
+        is 1.
+    discrete : bool, optional
+        If True, compute the discrete PhiID of the mean-binarised time-series (or of 
+        integer-valued time-series as they are), see phiid_2sources_2targets(). The 
+        default is False.
 
     Returns
-    -------from inspect import isfunction
+    -------
     phiid_wpe_dict : dictionary where keys are 
         'phiid_wpe', 'phiid_dc', 
         'phiid_cd', and value is float
         Causal emergence, downward causation, causal decoupling based on PhiID.
+        If red_func is a list, dictionary where keys are the redundancy functions,
+        and such dictionaries give values. With window, values are float arrays 
+        where entry k belongs to time-steps k*stride to k*stride+window.
     """
 
     if not isinstance(data_dict, dict):
@@ -55,15 +106,155 @@ def phiid_wpe(data_dict, time_lag_for_measure=1, red_func='mmi'):
 
     if type(time_lag_for_measure) != int or time_lag_for_measure < 1:
         raise ValueError('time_lag_for_measure either is not int, or it is below one')
-    if type(red_func) != str:
-        raise ValueError('red_func is not a str')
+    red_funcs = _red_func_list(red_func)
     
-    micro = data_dict['micro']
-    if micro.shape[0] < 2 and micro.shape[1] < 2:
-        raise ValueError('micro has less than 2 rows and less than 2 columns')
+    if discrete and ('lagged_cov' in data_dict or average_only):
+        raise ValueError('discrete PhiID needs time-series, and has no closed form (average_only)')
+    
+    # memory-mapped arrays are read chunk by chunk where the closed-form MMI atoms apply
+    read_memmap = backend == 'numpy' and window is None and not discrete and \
+        all(r.lower() == 'mmi' for r in red_funcs)
+    if 'lagged_cov' not in data_dict and _is_chunked(data_dict['micro'], read_memmap):
+        _check_chunked(backend, window)
+        if discrete:
+            raise ValueError('discrete PhiID is not supported for time-series given in chunks')
+        moments = _accumulate_moments([data_dict['micro']], [time_lag_for_measure])
+        if moments is not None:
+            S = moments[0].covariance(unit_variance=True)
+            phiid_dicts = {r: phiid_average(S, red_func=r) for r in red_funcs}
+        else:
+            phiid_dicts = dict.fromkeys(red_funcs)
+        phiid_wpe_dicts = {r: _phiid_wpe_from_atoms(phiid_dict) for r, phiid_dict in phiid_dicts.items()}
+        return phiid_wpe_dicts[red_func] if isinstance(red_func, str) else phiid_wpe_dicts
+    
+    if window is not None:
+        if 'lagged_cov' in data_dict:
+            raise ValueError('window is not supported in analytic mode')
+        micro = np.asarray(data_dict['micro'], dtype=float)
+        _check_window(window, stride, micro.shape[1], time_lag_for_measure)
+        phiid_wpe_dicts = _phiid_wpe_windows(micro, time_lag_for_measure, red_funcs, backend, 
+                                             average_only, window, stride, discrete)
+        return phiid_wpe_dicts[red_func] if isinstance(red_func, str) else phiid_wpe_dicts
+    
+    if 'lagged_cov' in data_dict:
+        # analytic ("infinite-data") mode: the population lagged covariance of the model
+        # replaces the time-series
+        S = correlation(data_dict['lagged_cov'](time_lag_for_measure))
+        phiid_dicts = {r: phiid_average(S, red_func=r) for r in red_funcs}
+    else:
+        micro = data_dict['micro']
+        if micro.shape[0] < 2 and micro.shape[1] < 2:
+            raise ValueError('micro has less than 2 rows and less than 2 columns')
     
-    if np.isnan(micro).any() != True:
-        phiid_dict = phiid_2sources_2targets(micro, time_lag_for_measure=time_lag_for_measure, red_func=red_func)
+        phiid_dicts = dict.fromkeys(red_funcs)
+        stats = data_dict.get('gaussian_stats')
+        if np.isnan(micro).any() != True and stats is not None and (backend == 'numpy' or average_only) \
+                and all(r.lower() == 'mmi' for r in red_funcs) and not discrete:
+            # the average of the local atoms of phiid_full() equals the closed form
+            phiid_dicts = {r: phiid_average_from_stats(stats, tau=time_lag_for_measure) for r in red_funcs}
+        elif np.isnan(micro).any() != True:
+            phiid_dicts = phiid_2sources_2targets(micro, time_lag_for_measure=time_lag_for_measure, 
+                                                  red_func=red_funcs, backend=backend, 
+                                                  average_only=average_only, discrete=discrete)
+    
+    phiid_wpe_dicts = {r: _phiid_wpe_from_atoms(phiid_dict) for r, phiid_dict in phiid_dicts.items()}
+    
+    return phiid_wpe_dicts[red_func] if isinstance(red_func, str) else phiid_wpe_dicts
+
+def _red_func_list(red_func):
+    # red_func as a list of redundancy functions
+    if isinstance(red_func, str):
+        return [red_func]
+    if not isinstance(red_func, (list, tuple)) or len(red_func) == 0 or \
+            not all(isinstance(r, str) for r in red_func):
+        raise ValueError('red_func is not a str or a list of str')
+    return list(red_func)
+
+def _is_chunked(x, read_memmap):
+    # paths of .npy files and iterators of chunks are read chunk by chunk; memory-mapped
+    # arrays only if read_memmap (otherwise they are used as any ndarray)
+    if isinstance(x, (list, tuple)):
+        raise ValueError('time-series is a list; pass an array, the path of a .npy file, '
+                         'or an iterator of chunks')
+    if isinstance(x, np.memmap):
+        return read_memmap
+    return isinstance(x, (str, os.PathLike, Iterator))
+
+def _iter_chunks(x):
+    # chunks of a time-series along its last axis
+    if isinstance(x, (str, os.PathLike)):
+        x = np.load(x, mmap_mode='r')
+    if hasattr(x, 'shape'):
+        for start in range(0, x.shape[-1], _chunk_size):
+            yield np.asarray(x[..., start:start + _chunk_size], dtype=float)
+    else:
+        for chunk in x:
+            yield np.asarray(chunk, dtype=float)
+
+def _check_chunked(backend, window):
+    if backend != 'numpy':
+        raise ValueError("time-series given in chunks require backend 'numpy'")
+    if window is not None:
+        raise ValueError('window is not supported for time-series given in chunks')
+
+def _accumulate_moments(series, time_lags):
+    # read the time-series (e.g. micro and macro, stacked) chunk by chunk in one pass, 
+    # and return their LaggedMoments for each time-lag (None if they contain NaN)
+    moments = [LaggedMoments(tau=time_lag) for time_lag in time_lags]
+    for chunks in zip(*[_iter_chunks(x) for x in series]):
+        chunk = np.vstack([np.atleast_2d(chunk) for chunk in chunks])
+        if np.isnan(chunk).any():
+            return None
+        for lagged_moments in moments:
+            lagged_moments.update(chunk)
+    return moments
+
+def _check_window(window, stride, n_time_steps, time_lag):
+    # a window needs at least two pairs of samples (t, t+time_lag)
+    if not isinstance(window, (int, np.integer)) or window < time_lag + 2 or window > n_time_steps:
+        raise ValueError('window either is not int, or it is not between time_lag_for_measure+2 '
+                         'and the number of time-steps')
+    if not isinstance(stride, (int, np.integer)) or stride < 1:
+        raise ValueError('stride either is not int, or it is below one')
+
+def _stack_windows(result_dicts):
+    # one dictionary of arrays from the dictionaries of consecutive windows
+    return {key: np.array([result_dict[key] for result_dict in result_dicts]) 
+            for key in result_dicts[0]}
+
+def _phiid_wpe_windows(micro, time_lag_for_measure, red_funcs, backend, average_only, window, stride,
+                       discrete=False):
+    # phiid_wpe() of each sliding window, as arrays
+    starts = sliding_windows(micro.shape[1], window, stride)
+    
+    phiid_dicts = dict.fromkeys(red_funcs, [None] * len(starts))
+    if not np.isnan(micro).any():
+        # MMI atoms in closed form from incrementally updated covariances; the average 
+        # of the local atoms of phiid_full() is the same
+        closed_form = [r for r in red_funcs 
+                       if r.lower() == 'mmi' and (backend == 'numpy' or average_only) and not discrete]
+        if closed_form:
+            S = sliding_lagged_covariance(micro, time_lag_for_measure, window, stride, unit_variance=True)
+            atoms = [phiid_average(s) for s in S]
+            phiid_dicts.update(dict.fromkeys(closed_form, atoms))
+        
+        others = [r for r in red_funcs if r not in closed_form]
+        if others:
+            window_dicts = [phiid_2sources_2targets(micro[:, start:start + window], 
+                                                    time_lag_for_measure=time_lag_for_measure, 
+                                                    red_func=others, backend=backend, 
+                                                    average_only=average_only, discrete=discrete) 
+                            for start in starts]
+            phiid_dicts.update({r: [window_dict[r] for window_dict in window_dicts] for r in others})
+    
+    return {r: _stack_windows([_phiid_wpe_from_atoms(atoms) for atoms in phiid_dicts[r]]) 
+            for r in red_funcs}
+
+def _phiid_wpe_from_atoms(phiid_dict):
+    # causal emergence, downward causation and causal decoupling from the PhiID atoms
+    # (NaN if phiid_dict is None)
+    
+    if phiid_dict is not None:
         
         if not isinstance(phiid_dict, dict):
             raise ValueError('phiid_dict is not a dict') 
@@ -106,16 +297,40 @@ def phiid_wpe(data_dict, time_lag_for_measure=1, red_func='mmi'):
 
     return phiid_wpe_dict
 
-def shannon_wpe(data_dict, time_lag_for_measure=1):
+def shannon_wpe(data_dict, time_lag_for_measure=1, backend='matlab', window=None, stride=1):
     """
     Purpose : Compute Shannon-based Causal Emergence.
     
     Parameters
     ----------
     data_dict : dictionary where 'micro' and 'macro' are keys, and float arrays give values 
-        Time-series of macro and micro variables.
-    time_lag_for_measure : integer, optional
+        Time-series of macro and micro variables. With backend 'numpy', the 
+        time-series can also be memory-mapped arrays, paths of .npy files, or 
+        iterators of chunks (D-by-T_chunk and of length T_chunk); they are then read 
+        chunk by chunk, with memory independent of their length. In analytic mode, 'lagged_cov' and 
+        'macro_weights' are keys, and a function of time_lag_for_measure that returns the 
+        population covariance of [micro_t; micro_t+tau], and the weights of the (linear) 
+        macro variable give values (see data_simulation.generate_2node_mvar_data).
+        If 'gaussian_stats' is a key (a gaussian.GaussianStats of micro and macro, as 
+        added by compute_emergence()), backend 'numpy' takes the lagged correlations 
+        from its cache.
+    time_lag_for_measure : integer, or list/tuple/range of integers, optional
         Time-lag in multivariate autoregressive time-series model. The default is 1.
+        If several time-lags are given, all of them are computed at once (with the 
+        numpy backend, from a single FFT-based cross-correlation pass).
+    backend : string, optional
+        Either 'matlab' (EmergencePsi.m, EmergenceDelta.m, EmergenceGamma.m via the 
+        MATLAB engine) or 'numpy' (native implementation in complexpy.shannon). 
+        The default is 'matlab'.
+    window : integer, optional
+        If given, compute the measures in sliding windows of window time-steps 
+        (time-resolved emergence). With backend 'numpy', the lagged covariance is 
+        updated incrementally as the window slides, and all windows are computed at 
+        once; with backend 'matlab', each window is computed separately. The default 
+        is None (one value for the whole time-series).
+    stride : integer, optional
+        Number of time-steps between the starts of consecutive windows. The default 
+        is 1.
 
     Returns
     -------
@@ -123,14 +338,57 @@ def shannon_wpe(data_dict, time_lag_for_measure=1):
         'causal_emergence_pract', 'downward_causation_pract', 
         'causal_decoupling_pract', and value is float
         Causal emergence, downward causation, causal decoupling based on 
-        standard Shannon information.
+        standard Shannon information. If several time-lags are given, a dictionary 
+        where keys are the time-lags and values are such dictionaries. With window, 
+        values are float arrays where entry k belongs to time-steps k*stride to 
+        k*stride+window.
 
     """
     
     if type(data_dict) != dict:
         raise ValueError('data_dict is not a dict')
-    if type(time_lag_for_measure) != int or time_lag_for_measure < 1:
-        raise ValueError('time_lag_for_measure either is not int, or it is below one')
+
+    multi_lag = isinstance(time_lag_for_measure, (list, tuple, range))
+    time_lags = list(time_lag_for_measure) if multi_lag else [time_lag_for_measure]
+    if len(time_lags) == 0:
+        raise ValueError('time_lag_for_measure is empty')
+    for time_lag in time_lags:
+        if not isinstance(time_lag, (int, np.integer)) or isinstance(time_lag, bool) or time_lag < 1:
+            raise ValueError('time_lag_for_measure either is not int, or it is below one')
+    time_lags = [int(time_lag) for time_lag in time_lags]
+
+    if backend not in _backends:
+        raise ValueError(f'backend is not one of {_backends}')
+    
+    if 'lagged_cov' in data_dict:
+        # analytic ("infinite-data") mode: the population lagged covariance of the model
+        # replaces the time-series
+        if window is not None:
+            raise ValueError('window is not supported in analytic mode')
+        if data_dict.get('macro_weights') is None:
+            raise ValueError("key 'macro_weights' is missing in data_dict")
+        
+        criteria = [emergence_from_covariance(data_dict['lagged_cov'](time_lag), data_dict['macro_weights']) 
+                    for time_lag in time_lags]
+        shannon_wpe_dicts = {time_lag: {'shannon_wpe': shannon_wpe, 'shannon_dc': shannon_dc,
+                                        'shannon_cd': shannon_cd} 
+                             for time_lag, (shannon_wpe, shannon_dc, shannon_cd) in zip(time_lags, criteria)}
+        
+        return shannon_wpe_dicts if multi_lag else shannon_wpe_dicts[time_lags[0]]
+    
+    read_memmap = backend == 'numpy' and window is None
+    if _is_chunked(data_dict['micro'], read_memmap) or _is_chunked(data_dict['macro'], read_memmap):
+        _check_chunked(backend, window)
+        moments = _accumulate_moments([data_dict['micro'], data_dict['macro']], time_lags)
+        if moments is not None:
+            criteria = [_shannon_from_moments(lagged_moments) for lagged_moments in moments]
+        else:
+            criteria = [(float('NaN'), float('NaN'), float('NaN'))] * len(time_lags)
+        shannon_wpe_dicts = {time_lag: {'shannon_wpe': shannon_wpe, 'shannon_dc': shannon_dc,
+                                        'shannon_cd': shannon_cd} 
+                             for time_lag, (shannon_wpe, shannon_dc, shannon_cd) in zip(time_lags, criteria)}
+        
+        return shannon_wpe_dicts if multi_lag else shannon_wpe_dicts[time_lags[0]]
     
     micro = data_dict['micro'].T
     macro = data_dict['macro']
@@ -142,23 +400,139 @@ def shannon_wpe(data_dict, time_lag_for_measure=1):
         raise ValueError('micro has less than 2 rows and less than 2 columns')
     if macro.shape[0] < 2 and macro.shape[1] != 1:
         raise ValueError('macro has less than 2 rows and more than 2 columns')
+    check_lags(time_lags, micro.shape[0])
+
+    if window is not None:
+        _check_window(window, stride, micro.shape[0], max(time_lags))
+
+    if backend == 'numpy':
+        if window is not None:
+            criteria = [shannon_emergence_windows(micro, macro, time_lag, window, stride=stride) 
+                        for time_lag in time_lags]
+        elif data_dict.get('gaussian_stats') is not None:
+            criteria = [emergence_from_correlation(data_dict['gaussian_stats'].lagged_correlation(time_lag)) 
+                        for time_lag in time_lags]
+        else:
+            criteria = shannon_emergence_lags(micro, macro, time_lags) if multi_lag else \
+                [shannon_emergence(micro, macro, tau=time_lags[0])]
+    elif window is not None:
+        # one engine call per window, criterion and time-lag
+        eng = get_engine()
+        starts = sliding_windows(micro.shape[0], window, stride)
+        windows = [(to_matlab(micro[start:start + window]), to_matlab(macro[start:start + window])) 
+                   for start in starts]
+        
+        criteria = [tuple(np.array([criterion(micro_window, macro_window, time_lag, 'Gaussian') 
+                                    for micro_window, macro_window in windows]) 
+                          for criterion in [eng.EmergencePsi, eng.EmergenceDelta, eng.EmergenceGamma]) 
+                    for time_lag in time_lags]
+    else:
+        #file_path = os.path.abspath(os.path.dirname(__file__))
+        #oc.addpath(file_path + '/practical_measures_causal_emergence')  
 
-    #file_path = os.path.abspath(os.path.dirname(__file__))
-    #oc.addpath(file_path + '/practical_measures_causal_emergence')  
+        #eng.eval('pkg load statistics')
+        eng = get_engine()
+        micro, macro = to_matlab(micro), to_matlab(macro)
 
-    #eng.eval('pkg load statistics')
-    eng.addpath(_shannon_wpe_path)
+        criteria = [(eng.EmergencePsi(micro, macro, time_lag, 'Gaussian'),
+                     eng.EmergenceDelta(micro, macro, time_lag, 'Gaussian'),
+                     eng.EmergenceGamma(micro, macro, time_lag, 'Gaussian')) for time_lag in time_lags]
+    
+    shannon_wpe_dicts = {time_lag: {'shannon_wpe': shannon_wpe, 'shannon_dc': shannon_dc,
+                                    'shannon_cd': shannon_cd} 
+                         for time_lag, (shannon_wpe, shannon_dc, shannon_cd) in zip(time_lags, criteria)}
+    
+    return shannon_wpe_dicts if multi_lag else shannon_wpe_dicts[time_lags[0]]
 
-    shannon_wpe = eng.EmergencePsi(micro, macro, time_lag_for_measure, 'Gaussian')
-    shannon_dc = eng.EmergenceDelta(micro, macro, time_lag_for_measure, 'Gaussian') 
-    shannon_cd = eng.EmergenceGamma(micro, macro, time_lag_for_measure, 'Gaussian')
+class OnlineShannonWPE:
+    """
+    Purpose : Streaming estimator of Shannon-based Causal Emergence.
     
-    shannon_wpe_dict = {'shannon_wpe': shannon_wpe, 'shannon_dc': shannon_dc,
-                        'shannon_cd': shannon_cd}
+    Accepts a time-series chunk by chunk and keeps the running mean and 
+    co-moments (Welford-style, merged per chunk) of [micro_t, macro_t, micro_t+tau, 
+    macro_t+tau], together with the last tau samples to pair with the next chunk 
+    (see gaussian.LaggedMoments). Each update costs O(chunk length x D^2), and 
+    result() costs O(D^2), so the measures of a long-running simulation or 
+    recording can be monitored without re-running shannon_wpe() on an ever-growing 
+    array. result() equals shannon_wpe() (backend 'numpy') of all samples seen so far.
     
-    return shannon_wpe_dict
+    Parameters
+    ----------
+    time_lag_for_measure : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
     
-def phiid_2sources_2targets(micro, time_lag_for_measure=1, red_func='mmi'):
+    Attributes
+    ----------
+    n_samples : integer
+        Number of time-steps seen so far.
+        
+    """
+    
+    def __init__(self, time_lag_for_measure=1):
+        if type(time_lag_for_measure) != int or time_lag_for_measure < 1:
+            raise ValueError('time_lag_for_measure either is not int, or it is below one')
+        
+        self.time_lag_for_measure = time_lag_for_measure
+        self._moments = LaggedMoments(tau=time_lag_for_measure)
+    
+    @property
+    def n_samples(self):
+        return self._moments.n_samples
+    
+    def update(self, micro, macro):
+        """
+        Purpose : Add a chunk of time-steps to the estimate.
+        
+        Parameters
+        ----------
+        micro : float array
+            D-by-T_chunk time-series of micro variables (as data_dict['micro'] of 
+            shannon_wpe()).
+        macro : float array
+            Time-series of the macro variable, of length T_chunk.
+        
+        Returns
+        -------
+        self : OnlineShannonWPE
+        
+        """
+        
+        micro = np.atleast_2d(np.asarray(micro, dtype=float))
+        macro = np.ravel(np.asarray(macro, dtype=float))
+        if micro.shape[1] != len(macro):
+            raise ValueError('micro and macro do not have the same number of time-steps')
+        
+        self._moments.update(np.vstack([micro, macro]))
+        return self
+    
+    def result(self):
+        """
+        Purpose : Causal emergence, downward causation and causal decoupling of all 
+        time-steps seen so far.
+        
+        Returns
+        -------
+        shannon_wpe_dict : dictionary where keys are 'shannon_wpe', 'shannon_dc', 
+            'shannon_cd', and value is float (NaN before the first two pairs of 
+            time-steps)
+        
+        """
+        
+        if self._moments.n_pairs < 2:
+            shannon_wpe, shannon_dc, shannon_cd = float('NaN'), float('NaN'), float('NaN')
+        else:
+            shannon_wpe, shannon_dc, shannon_cd = _shannon_from_moments(self._moments)
+        
+        return {'shannon_wpe': shannon_wpe, 'shannon_dc': shannon_dc, 'shannon_cd': shannon_cd}
+
+def _shannon_from_moments(moments):
+    # Psi, Delta and Gamma from the LaggedMoments of [micro; macro]
+    S = moments.covariance()
+    N = S.shape[0] // 2
+    return emergence_from_correlation(correlation(S)[:N, N:])
+    
+def phiid_2sources_2targets(micro, time_lag_for_measure=1, red_func='mmi', backend='matlab',
+                            average_only=False, discrete=False):
     """
     Purpose : Compute Integrated Information Decomposition.
     
@@ -168,45 +542,142 @@ def phiid_2sources_2targets(micro, time_lag_for_measure=1, red_func='mmi'):
         Time-series of micro variables.
     time_lag_for_measure : integer, optional
         Time-lag in multivariate autoregressive time-series model. The default is 1.
-    red_func : string, optional
-        Redundancy function to do a PhiID. The default is 'mmi'.
+    red_func : string or list of strings, optional
+        Redundancy function to do a PhiID. For a list, PhiID is computed for all 
+        redundancy functions; with backend 'numpy', all of them share one computation 
+        of the local mutual informations. The default is 'mmi'.
+    backend : string, optional
+        Either 'matlab' (PhiIDFull.m via the MATLAB engine) or 'numpy' (native
+        implementation in complexpy.phiid). The default is 'matlab'.
+    average_only : bool, optional
+        If True, compute the average atoms in closed form from the lagged covariance
+        (native, only for red_func 'mmi'); the cost does not grow with the number of
+        time-steps. The default is False.
+    discrete : bool, optional
+        If True, compute the discrete PhiID (in bits) of the mean-binarised micro 
+        variables, or of integer-valued micro variables as they are: PhiIDFullDiscrete.m 
+        with backend 'matlab', phiid_discrete.phiid_full_discrete() with backend 
+        'numpy'. The default is False.
 
     Returns
     -------
-    phiid : Matlab struct
-        Whole-parts emergence, downward causation, causal decoupling.
+    phiid : dictionary where keys are 'rtr', ..., 'sts', and value is float
+        Average PhiID atoms. If red_func is a list, dictionary where keys are the 
+        redundancy functions, and dictionaries of atoms give values.
 
     """
     
     if type(time_lag_for_measure) != int or time_lag_for_measure < 1:
         raise ValueError('time_lag_for_measure either is not int, or it is below one')
-    if type(red_func) != str:
-        raise ValueError('red_func is not a str')
+    red_funcs = _red_func_list(red_func)
+    if backend not in _backends:
+        raise ValueError(f'backend is not one of {_backends}')
     if micro.shape[0] < 2 and micro.shape[1] < 2:
         raise ValueError('micro has less than 2 rows and less than 2 columns')
+    if discrete and average_only:
+        raise ValueError('discrete PhiID has no closed form (average_only)')
         
     if np.isnan(micro).any() !=  True:
-        
-        #file_path = os.path.abspath(os.path.dirname(__file__))
-        #eng.chdir(file_path+'/phiid') 
-        #eng.javaaddpath(file_path + '/phiid/infodynamics.jar')
-        #eng.eval('pkg load statistics')
 
-        eng.addpath(_phiid_path)
-        eng.javaaddpath(_infodynamics_jar_path, '-end', nargout=0)
+        if discrete and backend == 'numpy':
+            phiid_dicts, _ = phiid_full_discrete(micro, tau=time_lag_for_measure, red_func=red_funcs)
+
+        elif average_only:
+            S = lagged_covariance(standardize(np.asarray(micro, dtype=float)), time_lag_for_measure)
+            phiid_dicts = {r: phiid_average(S, red_func=r) for r in red_funcs}
         
-        micro = matlab.double(micro.tolist())
-        time_lag_for_measure = matlab.double(time_lag_for_measure)
+        elif backend == 'numpy':
+            phiid_dicts, _ = phiid_full(np.asarray(micro, dtype=float), tau=time_lag_for_measure,
+                                        red_func=red_funcs)
         
-        phiid_dict = eng.PhiIDFull(micro, time_lag_for_measure, red_func)
-        #eng.chdir(file_path)
+        else:
+            #file_path = os.path.abspath(os.path.dirname(__file__))
+            #eng.chdir(file_path+'/phiid') 
+            #eng.javaaddpath(file_path + '/phiid/infodynamics.jar')
+            #eng.eval('pkg load statistics')
+    
+            eng = get_engine()
+            
+            micro = to_matlab(micro)
+            time_lag_for_measure = to_matlab(time_lag_for_measure)
+            
+            # PhiIDFull.m computes one redundancy function per call
+            phiid_full_m = eng.PhiIDFullDiscrete if discrete else eng.PhiIDFull
+            phiid_dicts = {r: phiid_full_m(micro, time_lag_for_measure, r) for r in red_funcs}
+            #eng.chdir(file_path)
 
-        return phiid_dict
+        return phiid_dicts[red_func] if isinstance(red_func, str) else phiid_dicts
         
     else: 
         return float('NaN')
     
 
+def phiid_2sources_2targets_local(micro, time_lag_for_measure=1, red_func='mmi', backend='matlab', atoms=None,
+                                  dtype=np.float64, out=None):
+    """
+    Purpose : Compute local (per-sample) Integrated Information Decomposition atoms.
+    
+    Parameters
+    ----------
+    micro : float array
+        Time-series of micro variables.
+    time_lag_for_measure : integer, optional
+        Time-lag in multivariate autoregressive time-series model. The default is 1.
+    red_func : string, optional
+        Redundancy function to do a PhiID. The default is 'mmi'.
+    backend : string, optional
+        Either 'matlab' (local atoms L of PhiIDFull.m via the MATLAB engine) or 'numpy' 
+        (complexpy.phiid.phiid_local_atoms(), which computes the atoms in chunks and 
+        never holds all 16 float64 atoms in memory). The default is 'matlab'.
+    atoms : list of strings, optional
+        Atoms to return, e.g. ['str', 'stx', 'sty', 'sts']. The default is None (all 16 
+        atoms, ordered as 'rtr', ..., 'sts').
+    dtype : data type, optional
+        Data type of the local atoms, e.g. np.float32. The default is np.float64.
+    out : string or float array, optional
+        Path of a .npy file to write the local atoms to (memory-mapped), or an array 
+        of shape (len(atoms), T-time_lag_for_measure) and data type dtype to write them 
+        into. The default is None (new in-memory array).
+
+    Returns
+    -------
+    local_atoms : float array (np.memmap if out is a path)
+        len(atoms)-by-(T-time_lag_for_measure) array of local PhiID atoms.
+
+    """
+    
+    if type(time_lag_for_measure) != int or time_lag_for_measure < 1:
+        raise ValueError('time_lag_for_measure either is not int, or it is below one')
+    if type(red_func) != str:
+        raise ValueError('red_func is not a str')
+    if backend not in _backends:
+        raise ValueError(f'backend is not one of {_backends}')
+    
+    if backend == 'numpy':
+        return phiid_local_atoms(np.asarray(micro, dtype=float), tau=time_lag_for_measure, red_func=red_func, 
+                                 atoms=atoms, dtype=dtype, out=out)
+    
+    names = ATOM_NAMES if atoms is None else list(atoms)
+    if len(names) == 0 or not all(name in ATOM_NAMES for name in names):
+        raise ValueError(f'atoms must be a non-empty list of atoms in {ATOM_NAMES}')
+    
+    # the shape of the output is checked before MATLAB is started
+    n_samples = np.shape(micro)[1] - time_lag_for_measure
+    local_atoms = _local_atoms_output(out, (len(names), n_samples), dtype)
+    
+    eng = get_engine()
+    _, local_dict = eng.PhiIDFull(to_matlab(micro), to_matlab(time_lag_for_measure), red_func, nargout=2)
+    
+    # convert one atom at a time, straight into the output
+    finite = True
+    for row, name in enumerate(names):
+        local_atom = from_matlab(local_dict[name]).ravel()
+        finite = finite and np.isfinite(local_atom).all()
+        local_atoms[row] = local_atom
+    
+    _finish_local_atoms(local_atoms, finite)
+    return local_atoms
+
 # -----------------------------------------------------------------------------
 # DYNAMICAL INDEPENDENCE
 # -----------------------------------------------------------------------------
@@ -223,6 +694,106 @@ def phiid_2sources_2targets(micro, time_lag_for_measure=1, red_func='mmi'):
 # PARAMETER SWEEP
 # -----------------------------------------------------------------------------
 
+# measure parameters of which all values are computed in one call in sweeps
+_batchable_params = {phiid_wpe: 'red_func'}
+
+# measures that read the Gaussian statistics shared in sweeps (data_dict['gaussian_stats'])
+_gaussian_stats_measures = [phiid_wpe, shannon_wpe]
+
+# columns of the result dataframe with few distinct values, stored as categoricals
+_categorical_columns = ['measure', 'red_func']
+
+class _ResultColumns:
+    """
+    Purpose : Column buffers for results, turned into a dataframe in one step.
+    """
+    
+    def __init__(self):
+        self.columns = {}
+        self.n_rows = 0
+        
+    def extend(self, n_rows, columns, shared=None):
+        """
+        Purpose : Append n_rows rows.
+        
+        Parameters
+        ----------
+        n_rows : integer
+            Number of rows.
+        columns : dictionary where keys are column names, and lists of length n_rows give values
+            Values that differ between the rows.
+        shared : dictionary where keys are column names, and values are single values, optional
+            Values that are the same for all rows (e.g., parameters).
+
+        """
+        
+        shared = {} if shared is None else shared
+        
+        # columns seen for the first time are NaN in all previous rows (as with pd.concat)
+        for name in list(columns) + list(shared):
+            if name not in self.columns:
+                self.columns[name] = [np.nan] * self.n_rows
+        
+        for name, column in self.columns.items():
+            if name in columns:
+                column.extend(columns[name])
+            else:
+                column.extend([shared.get(name, np.nan)] * n_rows)
+                
+        self.n_rows += n_rows
+        
+    def to_frame(self):
+        return _with_categories(pd.DataFrame(self.columns))
+    
+    @classmethod
+    def from_frame(cls, emergence_df):
+        result_columns = cls()
+        result_columns.extend(len(emergence_df), {name: emergence_df[name].tolist() for name in emergence_df})
+        return result_columns
+
+def _with_categories(emergence_df):
+    for column in _categorical_columns:
+        if column in emergence_df:
+            emergence_df[column] = emergence_df[column].astype('category')
+    return emergence_df
+
+def _add_measure_results(result_columns, measure_func, measure_params_dict, data_dict, shared=None):
+    # compute a measure for all combinations of its parameters, and append one row per output
+    # of the measure to result_columns
+    shared = {} if shared is None else shared
+    names = list(measure_params_dict)
+    values = [list(measure_params) for measure_params in measure_params_dict.values()]
+    
+    # results with the indices of their parameter values, in the order of the calls
+    blocks = []
+    for indices in product(*[range(len(measure_params)) for measure_params in values]):
+
+        # we create a dict with measure parameters for one possible single calculation
+        measure_params_dict_for_calc = {name: measure_params[index] 
+                                        for name, measure_params, index in zip(names, values, indices)}
+        
+        emergence_result = measure_func(data_dict, **measure_params_dict_for_calc)
+        
+        # a list-valued parameter (e.g. red_func=['mmi', 'ccs']) gives one result per element; 
+        # these are stored as if the measure had been called for each element
+        batched_param = next((name for name, value in measure_params_dict_for_calc.items() 
+                              if isinstance(value, list) and list(emergence_result) == value), None)
+        batch = emergence_result.items() if batched_param is not None else [(None, emergence_result)]
+        
+        for element, (param_value, result) in enumerate(batch):
+            params = dict(measure_params_dict_for_calc)
+            order = indices
+            if batched_param is not None:
+                params[batched_param] = param_value
+                order = tuple(element if name == batched_param else index for name, index in zip(names, indices))
+            blocks.append((order, result, params))
+    
+    # unless the batched parameter is the last one, its elements come out of the order of 
+    # the unbatched sweep; sorting by the indices of the parameter values restores it
+    for _, result, params in sorted(blocks, key=lambda block: block[0]):
+        result_columns.extend(len(result), {'value': list(result.values()), 'measure': list(result)},
+                              {**params, **shared})
+
 def get_result_for_measure(measure_name, measure_func, measure_params_dict, data_dict):                          
     """
     Purpose : Compute Integrated Information Decomposition.
@@ -244,8 +815,6 @@ def get_result_for_measure(measure_name, measure_func, measure_params_dict, data
 
     """
     
-    emergence_df_temp = []
-    
     if type(data_dict) != dict:
         raise ValueError('data_dict is not a dict')
     if not callable(measure_func):
@@ -255,51 +824,363 @@ def get_result_for_measure(measure_name, measure_func, measure_params_dict, data
     if type(measure_name) != str:
         raise ValueError('measure_name is not a str')
     
-    for measure_params in product(*[measure_params for measure_param_name, measure_params in measure_params_dict.items()]):
+    result_columns = _ResultColumns()
+    _add_measure_results(result_columns, measure_func, measure_params_dict, data_dict)
+            
+    return result_columns.to_frame()
 
-        # we create a dict with measure parameters for one possible single calculation
-        measure_params_dict_for_calc = {measure_param_name_for_calc: measure_param_for_calc for 
-                                        measure_param_name_for_calc, measure_param_for_calc in 
-                                        zip(measure_params_dict, measure_params)}
+def _resolve_measure_variables(measure_variables, parameters):
+    """
+    Purpose : Map the measure variables naming the micro/macro data onto parameter names.
+    
+    Measure variables containing 'micro' are replaced by the parameter containing 
+    'micro' (e.g. 'micro_func_mvar'), and likewise for 'macro', so that they can be 
+    looked up in parameters. Returns a new dictionary; measure_variables is not changed.
+    """
+    
+    resolved = {measure: list(variables) for measure, variables in measure_variables.items()}
+    
+    new_key = None
+    for search_word in ['micro', 'macro']:
+        for key in parameters:
+            if search_word in key:
+                new_key = key
+        if new_key is None:
+            continue
         
-        emergence_result = measure_func(data_dict, **measure_params_dict_for_calc)
-                
-        for key in emergence_result:
-            df_temp = pd.DataFrame({'value': [emergence_result[key]], 'measure': [key], 
-                                    **{measure_param_name_for_calc: [measure_param_for_calc] for 
-                                       measure_param_name_for_calc, measure_param_for_calc in 
-                                       measure_params_dict_for_calc.items()}})
-            
-            emergence_df_temp.append(df_temp)
-            
-    return pd.concat(emergence_df_temp, ignore_index=True)
+        for variables in resolved.values():
+            for index, item in enumerate(variables):
+                if search_word in item:
+                    variables[index] = new_key
+                    
+    return resolved
 
-def compute_emergence(model_functions, model_variables, emergence_functions, measure_variables, parameters):
+def _batch_measure_params(measure_func, measure_params_dict):
     """
-    Purpose : Compute all measures for all measure and model parameters.
+    Purpose : Pass all values of a batchable measure parameter to the measure in one call.
+    
+    Measures that accept a list for one of their parameters and share work between
+    its elements (phiid_wpe: red_func) get all values of that parameter as a single
+    list-valued parameter value, in the position of the parameter; the results are 
+    put back into the row order of the unbatched sweep by _add_measure_results().
+    """
+    
+    # look through wrappers such as functools.partial and cache.CachedMeasure
+    func = measure_func
+    while hasattr(func, 'func'):
+        func = func.func
+        
+    batched_param = _batchable_params.get(func)
+    values = measure_params_dict.get(batched_param)
+    if batched_param is None or values is None or len(values) < 2:
+        return measure_params_dict
+    
+    return {name: [list(value)] if name == batched_param else value 
+            for name, value in measure_params_dict.items()}
+
+def _unwrap_partial(func):
+    # innermost function of (nested) functools.partial wrappers, and the positional and
+    # keyword arguments they bind; keywords of outer wrappers take precedence
+    args, keywords = (), {}
+    while hasattr(func, 'func'):
+        args = tuple(getattr(func, 'args', ())) + args
+        keywords = {**getattr(func, 'keywords', {}), **keywords}
+        func = func.func
+    return func, args, keywords
+
+def _uses_gaussian_stats(measure_func, measure_params_dict):
+    # whether a measure reads data_dict['gaussian_stats'] for any of its parameter values, 
+    # i.e. phiid_wpe or shannon_wpe with the native Gaussian (not discrete) estimators
+    func, _, keywords = _unwrap_partial(measure_func)
+    if func not in _gaussian_stats_measures:
+        return False
+    
+    def values(name, default):
+        return list(measure_params_dict.get(name, [keywords.get(name, default)]))
+    
+    return ('numpy' in values('backend', 'matlab') or True in values('average_only', False)) \
+        and False in values('discrete', False)
+
+def _batch_key(model_function, model_params_dict):
+    # model instantiations of generate_2node_mvar_data() with the numpy backend that have
+    # the same key (npoints, time_lag_for_model, seed) are simulated together with 
+    # sim_mvar_networks(), which gives the same time-series as one simulation each;
+    # None for all other model instantiations
+    func, args, keywords = _unwrap_partial(model_function)
+    params = {**keywords, **model_params_dict}
+    if func is not generate_2node_mvar_data or args or params.get('backend', 'matlab') != 'numpy' \
+            or params.get('analytic', False):
+        return None
+    
+    seed = params.get('seed', 1)
+    try:
+        coupling, noise_corr = float(params['coupling']), float(params['noise_corr'])
+        npoints, time_lag_for_model = int(params['npoints']), int(params['time_lag_for_model'])
+    except (KeyError, TypeError, ValueError):
+        # left to generate_2node_mvar_data() to report
+        return None
+    if np.isnan(coupling) or np.isnan(noise_corr) or isinstance(seed, bool) \
+            or not isinstance(seed, (int, np.integer)):
+        return None
+    
+    return (npoints, time_lag_for_model, int(seed))
+
+def _simulate_batch(tasks):
+    # data dicts of model instantiations with one _batch_key(), as generate_2node_mvar_data() 
+    # returns them, simulated at once
+    params = [{**_unwrap_partial(task[0])[2], **task[1]} for task in tasks]
+    npoints, time_lag_for_model, seed = _batch_key(*tasks[0][:2])
+    sim_data = _sim_2node_mvar_batch([p['coupling'] for p in params], [p['noise_corr'] for p in params],
+                                     npoints, time_lag_for_model, seed=seed)
+    
+    return [_2node_mvar_data_dict(data, p.get('macro_func_mvar'), p.get('micro_func_mvar')) 
+            for data, p in zip(sim_data, params)]
+
+def _emergence_for_model_params(model_function, model_params_dict, emergence_functions, measure_params_dicts,
+                                data_dict=None):
+    """
+    Purpose : Simulate one model instantiation and compute all measures for it.
     
     Parameters
     ----------
-    model_functions : dictionary
-        Dictionary with function names and functions.
-    model_variables : dictionary
-        Dictionary with model variables.
+    model_function : function
+        Function generating micro and macro time series.
+    model_params_dict : dictionary
+        Model parameters of one possible model instantiation.
     emergence_functions : dictionary
         Dictionary with function names and functions.
-    measure_variables : dictionary
-	Dictionary with measure variables.
-    parameters : dictionary
-        All measure and model parameters.
+    measure_params_dicts : dictionary where keys are measure names, and dictionaries give values
+        All values of the measure parameters of each measure.
+    data_dict : dictionary, optional
+        Time series of the model instantiation if they are already simulated (see 
+        _simulate_batch()). The default is None (simulated with model_function).
         
     Returns
     -------
-    emergence_df : dataframe
-        Includes all measures, and measure and model parameters.
+    result_columns : _ResultColumns
+        Results of all measures, including measure and model parameters.
+
+    """
+    
+    result_columns = _ResultColumns()
+    
+    # function-valued model parameters are stored by name
+    model_columns = {key: value if not callable(value) else value.__name__ 
+                     for key, value in model_params_dict.items()}
+    
+    print(tuple(model_params_dict.values()))
+
+    # we create a dict with micro and macro time series following one possible model instantiation
+    # (simulated once for all measures)
+    if data_dict is None:
+        data_dict = model_function(**model_params_dict)   
+    shares_stats = isinstance(data_dict, dict) and isinstance(data_dict.get('micro'), np.ndarray) \
+        and 'gaussian_stats' not in data_dict
+    stats_dict = None
+                                  
+    for measure in emergence_functions:   
+        measure_data_dict = data_dict
+        if shares_stats and _uses_gaussian_stats(emergence_functions[measure], measure_params_dicts[measure]):
+            # the Gaussian statistics are computed once, and shared by the measures that read them
+            if stats_dict is None:
+                stats_dict = dict(data_dict, gaussian_stats=GaussianStats(data_dict['micro'], 
+                                                                          data_dict.get('macro')))
+            measure_data_dict = stats_dict
+        
+        # includes both measure and model parameters
+        _add_measure_results(result_columns, emergence_functions[measure], measure_params_dicts[measure], 
+                             measure_data_dict, shared=model_columns)
+        
+    return result_columns
+
+def _run_tasks(checkpoint_paths, tasks):
+    # compute model instantiations of one batch (see SweepPlan), simulated together if there
+    # are several
+    data_dicts = _simulate_batch(tasks) if len(tasks) > 1 else [None]
+    return [_run_task(checkpoint_path, task, data_dict) 
+            for checkpoint_path, task, data_dict in zip(checkpoint_paths, tasks, data_dicts)]
+
+def _run_task(checkpoint_path, task, data_dict=None):
+    # compute one model instantiation; with a checkpoint path, write its results to disk
+    # (atomically, so that a killed sweep never leaves a partial checkpoint) instead of
+    # returning them
+    result_columns = _emergence_for_model_params(*task, data_dict=data_dict)
+    if checkpoint_path is None:
+        return result_columns
+    
+    tmp_path = f'{checkpoint_path}.{os.getpid()}.tmp'
+    result_columns.to_frame().to_pickle(tmp_path)
+    os.replace(tmp_path, checkpoint_path)
+
+def _init_worker():
+    # every worker process starts its own MATLAB engine on first use; quit it when the pool
+    # shuts the worker down (multiprocessing children do not run atexit handlers)
+    Finalize(None, shutdown_engine, exitpriority=10)
+
+class SweepPlan:
+    """
+    Purpose : Execution plan of a parameter sweep, see plan_emergence().
+    
+    Attributes
+    ----------
+    models : list of strings
+        Model of each cell (model instantiation), in the order of the sweep.
+    tasks : list of tuples
+        (model_function, model_params_dict, emergence_functions, measure_params_dicts)
+        of each unique model instantiation.
+    cell_tasks : list of integers
+        Index into tasks of each cell; identical cells share one task.
+    checkpoint_paths : list of strings or None
+        Checkpoint file of each task (None without results_dir).
+    batches : list of lists of integers
+        Indices into tasks that are simulated together (see plan_emergence()); each
+        other task forms a batch of its own.
+    n_cells : integer
+        Number of model instantiations of the sweep.
+    n_measure_calls : integer
+        Number of measure function calls of all unique model instantiations.
+    cost : integer
+        Relative cost estimate of the tasks still to be computed: time-steps 
+        ('npoints', or 1 for models without this parameter) simulated once per 
+        task and analysed once per measure call.
+        
+    """
+    
+    def __init__(self, models, tasks, cell_tasks, checkpoint_paths):
+        self.models = models
+        self.tasks = tasks
+        self.cell_tasks = cell_tasks
+        self.checkpoint_paths = checkpoint_paths
+        
+        self.batches = self._batches(tasks)
+        self.n_cells = len(cell_tasks)
+        self.n_measure_calls = sum(self._n_measure_calls(task) for task in tasks)
+        pending = self.pending()
+        self.cost = sum(int(task[1].get('npoints', 1)) * (1 + self._n_measure_calls(task)) 
+                        for i, task in enumerate(tasks) if i in pending)
+        
+    @staticmethod
+    def _batches(tasks):
+        # group the tasks by _batch_key(), in the order of their first task, into batches 
+        # of at most _max_batch_values simulated values each
+        groups = {}
+        for i, task in enumerate(tasks):
+            key = _batch_key(*task[:2])
+            groups.setdefault(i if key is None else key, []).append(i)
+        
+        batches = []
+        for key, group in groups.items():
+            size = 1 if not isinstance(key, tuple) else max(1, _max_batch_values // (2 * (key[0] + 500)))
+            batches.extend(group[start:start + size] for start in range(0, len(group), size))
+        return batches
+    
+    @staticmethod
+    def _n_measure_calls(task):
+        return sum(int(np.prod([len(values) for values in measure_params_dict.values()]))
+                   for measure_params_dict in task[3].values())
+    
+    def pending(self):
+        """
+        Purpose : Indices of the tasks that have no checkpoint yet.
+        """
+        
+        return {i for i, checkpoint_path in enumerate(self.checkpoint_paths) 
+                if checkpoint_path is None or not os.path.exists(checkpoint_path)}
+    
+    def __repr__(self):
+        return (f'SweepPlan({self.n_cells} cells, {len(self.tasks)} unique model instantiations, '
+                f'{len(self.pending())} to compute, {self.n_measure_calls} measure calls, cost {self.cost})')
+    
+    def iter_results(self, n_jobs=1):
+        """
+        Purpose : Run the plan, and yield the _ResultColumns of every cell in sweep order.
+        """
+        
+        if isinstance(n_jobs, bool) or not isinstance(n_jobs, (int, np.integer)) or (n_jobs < 1 and n_jobs != -1):
+            raise ValueError('n_jobs is not a positive integer or -1')
+        
+        return self._iter_results(n_jobs)
+    
+    def _iter_results(self, n_jobs):
+        pending = self.pending()
+        
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        
+        # results of tasks that are shared by later cells are kept until their last cell
+        last_cell = {task: cell for cell, task in enumerate(self.cell_tasks)}
+        kept = {}
+        
+        # the pending tasks of every batch, split into (up to) n_jobs units that the workers share
+        units = []
+        for batch in self.batches:
+            batch = [i for i in batch if i in pending]
+            if batch:
+                units.extend([int(i) for i in part] for part in np.array_split(batch, min(n_jobs, len(batch))))
+        unit_of = {i: unit for unit, tasks in enumerate(units) for i in tasks}
+        # results of the tasks of computed units whose cells come later
+        computed = {}
+        
+        executor = None
+        if n_jobs > 1 and len(units) > 1:
+            # spawned (not forked) workers, so that no worker inherits the MATLAB engine of this process
+            executor = ProcessPoolExecutor(max_workers=min(n_jobs, len(units)), mp_context=get_context('spawn'),
+                                           initializer=_init_worker)
+        try:
+            if executor is not None:
+                futures = [executor.submit(_run_tasks, [self.checkpoint_paths[i] for i in tasks], 
+                                           [self.tasks[i] for i in tasks]) for tasks in units]
+                
+            for cell, i in enumerate(self.cell_tasks):
+                if i in kept:
+                    result = kept[i]
+                elif i in pending:
+                    if i not in computed:
+                        tasks = units[unit_of[i]]
+                        results = futures[unit_of[i]].result() if executor is not None else \
+                            _run_tasks([self.checkpoint_paths[j] for j in tasks], [self.tasks[j] for j in tasks])
+                        computed.update(zip(tasks, results))
+                    result = computed.pop(i)
+                else:
+                    result = None
+                if result is None:
+                    result = _ResultColumns.from_frame(pd.read_pickle(self.checkpoint_paths[i]))
+                    
+                if last_cell[i] > cell:
+                    kept[i] = result
+                else:
+                    kept.pop(i, None)
+                yield result
+        finally:
+            # e.g. if the consumer of iter_emergence() stops early, tasks not yet started are cancelled
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
 
+def plan_emergence(model_functions, model_variables, emergence_functions, measure_variables, parameters,
+                   results_dir=None, version=None):
     """
+    Purpose : Plan a parameter sweep without computing anything.
     
-    # create empty list
-    emergence_df_temp = []
+    Resolves which parameters belong to which model and measure function once, lists
+    one cell per model instantiation (in the order of the sweep), and computes 
+    identical cells (same model and model parameters) only once. Every model 
+    instantiation is simulated once for all its measures. Model instantiations of 
+    data_simulation.generate_2node_mvar_data() with backend 'numpy' that share 
+    npoints, time_lag_for_model and seed are simulated together, with 
+    data_simulation.sim_mvar_networks() (the same time-series as one simulation each;
+    at most 512 MB of time-series at once).
+    
+    Parameters
+    ----------
+    model_functions, model_variables, emergence_functions, measure_variables, parameters, results_dir, version
+        See compute_emergence().
+        
+    Returns
+    -------
+    plan : SweepPlan
+        Execution plan with the number of cells, measure calls and estimated cost.
+
+    """
     
     if type(model_functions) != dict:
         raise ValueError('model_functions is not a dict')
@@ -316,7 +1197,7 @@ def compute_emergence(model_functions, model_variables, emergence_functions, mea
     if type(list(model_variables.values())[0]) != list:
         raise ValueError('value of model_variables is not a list')     
     if type(list(measure_variables.values())[0]) != list:
-        raise('value of measure_variables is not a list') 
+        raise ValueError('value of measure_variables is not a list') 
       
     # assert that each element in list is str
     for a_list in list(measure_variables.values()):
@@ -332,68 +1213,115 @@ def compute_emergence(model_functions, model_variables, emergence_functions, mea
     for model_function, emergence_function in zip(model_functions.values(), emergence_functions.values()):
         assert(callable(model_function))
         assert(callable(emergence_function))        
+        
+    resolved_measure_variables = _resolve_measure_variables(measure_variables, parameters)
   
+    models, tasks, cell_tasks, checkpoint_paths = [], [], [], []
+    task_index = {}
     for model in model_functions:
-        for params in product(*[parameters[param_name] for param_name in model_variables[model]]):          
-            print(params)
-
+        
+        # we create a dict with measure parameters with all possible values for each measure;
+        # includes only those measure parameters which are not model parameters
+        measure_params_dicts = {measure: _batch_measure_params(emergence_functions[measure],
+                                                               {param_name: parameters[param_name] 
+                                                                for param_name in resolved_measure_variables[measure] 
+                                                                if param_name not in model_variables[model]})
+                                for measure in emergence_functions}
+        
+        for params in product(*[parameters[param_name] for param_name in model_variables[model]]):
+            
             # we create a dict with model parameters for one possible single model instantiation
-            model_params_dict = {param_name: param for param_name, param in 
-                                 zip(model_variables[model], params)}  
+            model_params_dict = {param_name: param for param_name, param in zip(model_variables[model], params)}
+            task = (model_functions[model], model_params_dict, emergence_functions, measure_params_dicts)
             
-            # we create a dict with micro and macro time series following one possible model instantiation
-            data_dict = model_functions[model](**model_params_dict)   
-                                          
-            for measure in emergence_functions:   
+            # identical cells share one task; the key also names the checkpoint file
+            key = _call_key(_emergence_for_model_params, task, {}, version=version)
+            if key not in task_index:
+                task_index[key] = len(tasks)
+                tasks.append(task)
+                checkpoint_paths.append(None if results_dir is None else 
+                                        os.path.join(results_dir, f'{model}-{key[:32]}.pkl'))
                 
-                # replace key 'micro' in measure_variables by 'micro_func_mvar' so that we can take 
-                # value of 'micro_func_mvar' in parameters (this is done below)
-                search_word = 'micro'
-                for key, val in parameters.items():
-                    if search_word in key:
-                        new_key = key
+            models.append(model)
+            cell_tasks.append(task_index[key])
             
-                for key, val in measure_variables.items():                        
-                    for item in val:
-                        if search_word in item:
-                            index = val.index(item)
-                            measure_variables[key][index] = new_key
-                            
-                # if existent, replace key 'macro' in measure_variables by 'macro_func_mvar'
-                # so that we can take value of 'macro_func_mvar' in parameters (this is done below)
-                search_word = 'macro'
-                for key, val in parameters.items():
-                    if search_word in key:
-                        new_key = key
-                        
-                if new_key != []:
-                    for key, val in measure_variables.items():                        
-                        for item in val:
-                            if search_word in item:
-                                index = val.index(item)
-                                measure_variables[key][index] = new_key
-
-                # we create a dict with measure parameters with all possible values;
-                # includes only those measure parameters which are not already entailed by 
-                # model_params_dict   
-                measure_params_dict = {param_name: parameters[param_name] for param_name in 
-                                      measure_variables[measure] if param_name not in model_params_dict}
-                
-                # includes only measure parameters
-                df_temp = get_result_for_measure(measure, emergence_functions[measure], measure_params_dict, 
-                                                 data_dict)
-                
-                # includes both measure and model parameters
-                df_temp = df_temp.assign(**{key: value if not callable(value) 
-                                            else value.__name__ for key, value in model_params_dict.items()})
-                
-                # add df_temp to list emergence_df_temp
-                emergence_df_temp.append(df_temp)
-
-    emergence_df = pd.concat(emergence_df_temp, ignore_index = True)
+    if results_dir is not None:
+        os.makedirs(results_dir, exist_ok=True)
     
-    return emergence_df
+    return SweepPlan(models, tasks, cell_tasks, checkpoint_paths)
 
+def compute_emergence(model_functions, model_variables, emergence_functions, measure_variables, parameters,
+                      n_jobs=1, results_dir=None, version=None):
+    """
+    Purpose : Compute all measures for all measure and model parameters.
+    
+    Parameters
+    ----------
+    model_functions : dictionary
+        Dictionary with function names and functions.
+    model_variables : dictionary
+        Dictionary with model variables.
+    emergence_functions : dictionary
+        Dictionary with function names and functions.
+    measure_variables : dictionary
+	Dictionary with measure variables.
+    parameters : dictionary
+        All measure and model parameters.
+    n_jobs : integer, optional
+        Number of worker processes; -1 uses all CPUs. Model instantiations are
+        dispatched to the workers, each of which owns its own MATLAB engine, and
+        results are merged in the same order as with n_jobs=1. Model instantiations
+        that are simulated together (see plan_emergence()) are split into n_jobs parts. Model and measure
+        functions must be importable (e.g., no lambdas), and scripts must guard
+        the call with if __name__ == '__main__'. The default is 1 (serial).
+    results_dir : string, optional
+        Directory for checkpoints. If given, the results of every model instantiation
+        are written to their own file as soon as they are complete, and model
+        instantiations with an existing file (e.g. from an interrupted run with the
+        same measures and measure parameters) are skipped. The default is None 
+        (no checkpoints).
+    version : string or integer, optional
+        Version of user-defined model and measure functions, part of the checkpoint 
+        names. Functions are identified by name, not by code (the complexpy version 
+        covers its own functions), so change version whenever their code changes, 
+        or older checkpoints are returned. The default is None.
+        
+    Returns
+    -------
+    emergence_df : dataframe
+        Includes all measures, and measure and model parameters.
 
+    """
+    
+    plan = plan_emergence(model_functions, model_variables, emergence_functions, measure_variables, 
+                          parameters, results_dir=results_dir, version=version)
+    
+    # merge the column buffers of all model instantiations, and build the dataframe once
+    result_columns = _ResultColumns()
+    for result in plan.iter_results(n_jobs):
+        result_columns.extend(result.n_rows, result.columns)
+    emergence_df = result_columns.to_frame()
+    
+    return emergence_df
 
+def iter_emergence(model_functions, model_variables, emergence_functions, measure_variables, parameters,
+                   n_jobs=1, results_dir=None, version=None):
+    """
+    Purpose : Compute all measures for all measure and model parameters, one model instantiation at a time.
+    
+    Generator version of compute_emergence() (same parameters): the results are 
+    yielded as soon as all measures of a model instantiation are computed, in the 
+    order of the serial sweep. Closing the generator early (e.g. by leaving a for-loop
+    with break) cancels the model instantiations that have not been started yet.
+        
+    Yields
+    ------
+    emergence_df : dataframe
+        Includes all measures, and measure and model parameters, of one model instantiation.
 
+    """
+    
+    plan = plan_emergence(model_functions, model_variables, emergence_functions, measure_variables, 
+                          parameters, results_dir=results_dir, version=version)
+    
+    return (result.to_frame() for result in plan.iter_results(n_jobs))
@@ -8,57 +8,77 @@ Created on Mon Dec 27 17:44:25 2021
 
 import numpy as np
 import os
+from functools import partial
+from itertools import product
+from scipy.linalg import solve_discrete_lyapunov
 
-import matlab.engine
-
-# define Matlab engine
-eng = matlab.engine.start_matlab()
-
-# Calculate absolute paths to MATLAB code directories
-_module_dir = os.path.dirname(os.path.abspath(__file__))
-_project_root = os.path.dirname(os.path.dirname(_module_dir))
-_phiid_path = os.path.join(_project_root, 'src', 'phiid')
+from .engine import get_engine, to_matlab, from_matlab
 
 # -----------------------------------------------------------------------------
 # FUNCTIONS FOR DATA GENERATION
 # -----------------------------------------------------------------------------
 
 def generate_2node_mvar_data(coupling = None, npoints = None, time_lag_for_model = None, noise_corr = None, 
-                             macro_func_mvar = None, micro_func_mvar = None):
+                             macro_func_mvar = None, micro_func_mvar = None, backend = 'matlab', seed = 1,
+                             analytic = False):
     data_dict = dict()
     coupling_matrix = np.matrix([[coupling, coupling], [coupling, coupling]])
-    sim_data = mvar_sim_data(coupling_matrix, npoints = npoints, time_lag_for_model = time_lag_for_model, noise_corr = noise_corr)
+    
+    if analytic:
+        return mvar_analytic_data(np.asarray(coupling_matrix), time_lag_for_model = time_lag_for_model, 
+                                  noise_corr = noise_corr, macro_func_mvar = macro_func_mvar, 
+                                  micro_func_mvar = micro_func_mvar)
+    
+    sim_data = mvar_sim_data(coupling_matrix, npoints = npoints, time_lag_for_model = time_lag_for_model, noise_corr = noise_corr,
+                             backend = backend, seed = seed)
+
+    return _2node_mvar_data_dict(sim_data, macro_func_mvar, micro_func_mvar)
 
+def _2node_mvar_data_dict(sim_data, macro_func_mvar, micro_func_mvar):
+    # data dictionary of generate_2node_mvar_data() from simulated 2-by-npoints time-series
+    data_dict = dict()
     data_dict['macro'] = macro_func_mvar(sim_data) if macro_func_mvar is not None else None
     data_dict['micro'] = micro_func_mvar(sim_data) if micro_func_mvar is not None else sim_data
 
     return data_dict
 
-def mvar_sim_data(coupling_matrix, npoints = None, time_lag_for_model = None, noise_corr = None):
+def mvar_sim_data(coupling_matrix, npoints = None, time_lag_for_model = None, noise_corr = None, backend = 'matlab',
+                  seed = 1):
     """
-    Purpose : ...
+    Purpose : Simulate a multivariate autoregressive (MVAR) network.
     
     Parameters
     ----------
-    data : float
-        DESCRIPTION.
-    time_lag : integer, optional
-        Time-lag in multivariate autoregressive time-series model. The default is None.
-    macro_var : float, optional
-        Candidate emergent macro variable. The default is None.
+    coupling_matrix : float array
+        D-by-D coupling matrix A of the model X_t = A * X_{t-time_lag_for_model} + E_t.
+    npoints : integer
+        Number of time-points to keep.
+    time_lag_for_model : integer
+        Time-lag in multivariate autoregressive time-series model.
+    noise_corr : float
+        Correlation between the (unit variance) noise terms of any two nodes.
+    backend : string, optional
+        Either 'matlab' (sim_mvar_network.m via the MATLAB engine) or 'numpy' 
+        (sim_mvar_network() below). The default is 'matlab'.
+    seed : integer, optional
+        Seed of the random number generator of the numpy backend (the MATLAB 
+        script always uses rng(1)). The default is 1.
 
     Returns
     -------
-    shannon_wpe_dict : dictionary
-        Emergence capacity, downward causation, causal decoupling.
-    
-    Notes
-    -----
-    ...
+    sim_data : float array
+        D-by-npoints time-series of the network.
 
     """
     
+    if backend not in ['matlab', 'numpy']:
+        raise ValueError("backend is not one of ['matlab', 'numpy']")
+    
     if np.isnan(coupling_matrix).any() != True:
+        
+        if backend == 'numpy':
+            return sim_mvar_network(int(npoints), noise_corr, np.asarray(coupling_matrix, dtype=float), 
+                                    int(time_lag_for_model), seed=seed)
                 
         #file_path = os.path.abspath(os.path.dirname(__file__))
         #oc.addpath(file_path)    
@@ -67,21 +87,314 @@ def mvar_sim_data(coupling_matrix, npoints = None, time_lag_for_model = None, no
         #eng.eval('pkg load statistics')
         #eng.chdir('/src')
         #os.chdir('src/phiid')
-        eng.addpath(_phiid_path)
+        eng = get_engine()
 
-        coupling_matrix = matlab.double(coupling_matrix.tolist())
-        npoints = matlab.double(npoints)
-        time_lag_for_model = matlab.double(time_lag_for_model)
-        noise_corr = matlab.double(noise_corr)
+        coupling_matrix = to_matlab(coupling_matrix)
+        npoints = to_matlab(npoints)
+        time_lag_for_model = to_matlab(time_lag_for_model)
+        noise_corr = to_matlab(noise_corr)
 
         sim_data = eng.sim_mvar_network(npoints, noise_corr, coupling_matrix, time_lag_for_model)
-        sim_data = np.array(sim_data)
+        sim_data = from_matlab(sim_data)
 
         return sim_data
     
     else: 
         return float('NaN')
 
+def sim_mvar_network(npoints, noise_corr, coupling_matrix, time_lag, method = 'X', seed = 1, settle = 500):
+    """
+    Purpose : Simulate an MVAR network natively (port of sim_mvar_network.m).
+    
+    Only the requested simulation method is computed:
+    
+    - 'X': only the data point at t-time_lag influences the current data point,
+      X_t = A * X_{t-time_lag} + E_t (the method used by sim_mvar_network.m)
+    - 'Y': any data point up to t-time_lag influences the current data point,
+      X_t = A * X_{t-1} + ... + A * X_{t-time_lag} + E_t (methods Y and V in 
+      sim_mvar_network.m)
+    
+    Parameters
+    ----------
+    npoints : integer
+        Number of time-points to keep (after the burn-in).
+    noise_corr : float
+        Correlation between the (unit variance) noise terms of any two nodes.
+    coupling_matrix : float array
+        D-by-D coupling matrix A.
+    time_lag : integer
+        Time-lag of the model.
+    method : string, optional
+        Simulation method, 'X' or 'Y'. The default is 'X'.
+    seed : integer, optional
+        Seed for numpy.random.default_rng(). The default is 1.
+    settle : integer, optional
+        Number of initial (pre-equilibrium) time-points that are discarded. 
+        The default is 500.
+
+    Returns
+    -------
+    X : float array
+        D-by-npoints time-series of the network.
+
+    """
+    
+    if method not in ['X', 'Y']:
+        raise ValueError("method is not one of ['X', 'Y']")
+    if type(time_lag) != int or time_lag < 1:
+        raise ValueError('time_lag either is not int, or it is below one')
+    
+    nvar = coupling_matrix.shape[0]
+    time_length = npoints + settle
+    
+    # correlated, unit variance errors
+    cov_err = np.full((nvar, nvar), float(noise_corr))
+    np.fill_diagonal(cov_err, 1.0)
+    rng = np.random.default_rng(seed)
+    E = _noise_factor(cov_err) @ rng.standard_normal((nvar, time_length))
+    
+    X = np.zeros((nvar, time_length))
+    if method == 'X':
+        # the time_lag interleaved chains are independent, so advance them all at once, 
+        # one block of time_lag time-points per step
+        for t in range(time_lag, time_length, time_lag):
+            stop = min(t + time_lag, time_length)
+            X[:, t:stop] = coupling_matrix @ X[:, t - time_lag:stop - time_lag] + E[:, t:stop]
+    else:
+        for t in range(time_lag, time_length):
+            X[:, t] = coupling_matrix @ X[:, t - time_lag:t].sum(axis=1) + E[:, t]
+    
+    return X[:, settle:]
+
+
+def _noise_factor(cov_err):
+    # matrix F with F @ F.T = cov_err, for each covariance stacked along the leading axes:
+    # the Cholesky factor (as in earlier versions, which keeps their draws) where it exists, 
+    # and otherwise, for singular covariances such as noise_corr=1 (which mvnrnd accepts 
+    # too), the symmetric square root with eigenvalues clipped at 0
+    cov_err = np.asarray(cov_err, dtype=float)
+    factor = np.empty_like(cov_err)
+    for index in np.ndindex(cov_err.shape[:-2]):
+        try:
+            factor[index] = np.linalg.cholesky(cov_err[index])
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(cov_err[index])
+            factor[index] = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+    return factor
+
+
+def mvar_lagged_covariance(coupling_matrix, noise_corr, time_lag_for_model, time_lag_for_measure, transform = None):
+    """
+    Purpose : Stationary time-lagged covariance of an MVAR network (port of makeLaggedCovariance.m).
+    
+    The same-time covariance S solves the discrete Lyapunov equation A S A' - S + E = 0, 
+    where E is the noise covariance. For X_t = A * X_{t-time_lag_for_model} + E_t, 
+    X_t and X_t+tau are correlated only if tau = m * time_lag_for_model, in which case 
+    cov(X_t+tau, X_t) = A^m S.
+    
+    Parameters
+    ----------
+    coupling_matrix : float array
+        D-by-D coupling matrix A.
+    noise_corr : float
+        Correlation between the (unit variance) noise terms of any two nodes.
+    time_lag_for_model : integer
+        Time-lag in multivariate autoregressive time-series model.
+    time_lag_for_measure : integer
+        Time-lag tau between past and future.
+    transform : float array, optional
+        K-by-D matrix M; if given, the covariance of the linear transform M * X is 
+        returned instead. The default is None.
+
+    Returns
+    -------
+    lagged_cov : float array
+        2D-by-2D (or 2K-by-2K) covariance of [X_t; X_t+tau].
+
+    """
+    
+    A = np.asarray(coupling_matrix, dtype=float)
+    nvar = A.shape[0]
+    if np.max(np.abs(np.linalg.eigvals(A))) >= 1:
+        raise ValueError('coupling_matrix does not describe a stationary process')
+    
+    cov_err = np.full((nvar, nvar), float(noise_corr))
+    np.fill_diagonal(cov_err, 1.0)
+    S = solve_discrete_lyapunov(A, cov_err)
+    
+    m, remainder = divmod(time_lag_for_measure, time_lag_for_model)
+    cross = np.linalg.matrix_power(A, m) @ S if remainder == 0 else np.zeros_like(S)
+    
+    lagged_cov = np.block([[S, cross.T], [cross, S]])
+    lagged_cov = 0.5 * (lagged_cov + lagged_cov.T)
+    
+    if transform is not None:
+        M = np.asarray(transform, dtype=float)
+        M = np.block([[M, np.zeros_like(M)], [np.zeros_like(M), M]])
+        lagged_cov = M @ lagged_cov @ M.T
+    
+    return lagged_cov
+
+def mvar_analytic_data(coupling_matrix, time_lag_for_model = None, noise_corr = None, macro_func_mvar = None, 
+                       micro_func_mvar = None):
+    """
+    Purpose : Data dictionary of an MVAR network for the analytic ("infinite-data") mode.
+    
+    Instead of time-series, the dictionary holds the population lagged covariance of 
+    the micro variables, so that measures return exact population values without 
+    simulation or sampling noise. Micro and macro functions have to be linear; 
+    their matrices are obtained by applying them to the identity matrix.
+    
+    Parameters
+    ----------
+    coupling_matrix : float array
+        D-by-D coupling matrix.
+    time_lag_for_model : integer
+        Time-lag in multivariate autoregressive time-series model.
+    noise_corr : float
+        Correlation between the (unit variance) noise terms of any two nodes.
+    macro_func_mvar : function, optional
+        Linear function to compute the macro variable from a D-by-T array.
+    micro_func_mvar : function, optional
+        Linear function to compute the micro variables from a D-by-T array.
+
+    Returns
+    -------
+    data_dict : dictionary where 'micro', 'macro', 'lagged_cov' and 'macro_weights' are keys
+        'micro' and 'macro' are None, 'lagged_cov' is a function of time_lag_for_measure 
+        returning the covariance of [micro_t; micro_t+tau], and 'macro_weights' are the 
+        weights w of macro = w * micro (None if there is no macro function, or if the 
+        macro variable is not a linear function of the micro variables).
+
+    """
+    
+    identity = np.eye(np.shape(coupling_matrix)[0])
+    micro_matrix = np.atleast_2d(micro_func_mvar(identity)) if micro_func_mvar is not None else identity
+    
+    macro_weights = None
+    if macro_func_mvar is not None:
+        macro_matrix = np.ravel(macro_func_mvar(identity))
+        macro_weights = np.linalg.lstsq(micro_matrix.T, macro_matrix, rcond=None)[0]
+        if not np.allclose(micro_matrix.T @ macro_weights, macro_matrix):
+            macro_weights = None
+    
+    lagged_cov = partial(mvar_lagged_covariance, np.asarray(coupling_matrix, dtype=float), noise_corr, 
+                         int(time_lag_for_model), transform = micro_matrix)
+    
+    return {'micro': None, 'macro': None, 'lagged_cov': lagged_cov, 'macro_weights': macro_weights}
+
+def sim_mvar_networks(npoints, noise_corrs, coupling_matrices, time_lag, seed = 1, settle = 500):
+    """
+    Purpose : Simulate many MVAR network configurations at once (method 'X').
+    
+    All configurations are advanced together, one block of time_lag time-points per 
+    step, as a single (configs, nodes, time) array. Every configuration is driven by 
+    the same standard normal draws (as sim_mvar_network.m, which always uses rng(1)), 
+    so configuration c equals sim_mvar_network(npoints, noise_corrs[c], 
+    coupling_matrices[c], time_lag, seed=seed, settle=settle). The time-series of 
+    all configurations are held in memory at once: C*D*(npoints+settle) float64 
+    values, e.g. 1.2 GB for C=100, D=2 and npoints=750000.
+    
+    Parameters
+    ----------
+    npoints : integer
+        Number of time-points to keep (after the burn-in).
+    noise_corrs : float array
+        Noise correlation of each configuration, of length C.
+    coupling_matrices : float array
+        C-by-D-by-D coupling matrices.
+    time_lag : integer
+        Time-lag of the model.
+    seed : integer, optional
+        Seed for numpy.random.default_rng(). The default is 1.
+    settle : integer, optional
+        Number of initial (pre-equilibrium) time-points that are discarded. 
+        The default is 500.
+
+    Returns
+    -------
+    X : float array
+        C-by-D-by-npoints time-series of all configurations.
+
+    """
+    
+    if type(time_lag) != int or time_lag < 1:
+        raise ValueError('time_lag either is not int, or it is below one')
+    
+    coupling_matrices = np.asarray(coupling_matrices, dtype=float)
+    noise_corrs = np.asarray(noise_corrs, dtype=float)
+    if coupling_matrices.ndim != 3 or coupling_matrices.shape[1] != coupling_matrices.shape[2]:
+        raise ValueError('coupling_matrices is not a C-by-D-by-D array')
+    if noise_corrs.shape != (coupling_matrices.shape[0],):
+        raise ValueError('noise_corrs and coupling_matrices have a different number of configurations')
+    
+    nconfigs, nvar = coupling_matrices.shape[:2]
+    time_length = npoints + settle
+    
+    # correlated, unit variance errors of every configuration
+    cov_err = np.broadcast_to(noise_corrs[:, None, None], (nconfigs, nvar, nvar)).copy()
+    cov_err[:, np.arange(nvar), np.arange(nvar)] = 1.0
+    rng = np.random.default_rng(seed)
+    X = _noise_factor(cov_err) @ rng.standard_normal((nvar, time_length))
+    
+    # X holds the errors E and is overwritten in place by X_t = A * X_{t-time_lag} + E_t
+    X[:, :, :time_lag] = 0
+    for t in range(time_lag, time_length, time_lag):
+        stop = min(t + time_lag, time_length)
+        X[:, :, t:stop] += coupling_matrices @ X[:, :, t - time_lag:stop - time_lag]
+    
+    return X[:, :, settle:]
+
+def generate_2node_mvar_batch(coupling = None, noise_corr = None, npoints = None, time_lag_for_model = None,
+                              macro_func_mvar = None, micro_func_mvar = None, seed = 1):
+    """
+    Purpose : Simulate the 2-node MVAR model for every (coupling, noise_corr) pair at once.
+    
+    Configuration c equals generate_2node_mvar_data() with backend 'numpy' and the 
+    same seed (compute_emergence() batches such model instantiations the same way). 
+    All C = len(coupling)*len(noise_corr) configurations are held in memory at once, 
+    as C*2*(npoints+500) float64 values (see sim_mvar_networks()).
+    
+    Parameters
+    ----------
+    coupling : float array
+        Coupling strengths.
+    noise_corr : float array
+        Noise correlations.
+    npoints : integer
+        Number of time-points.
+    time_lag_for_model : integer
+        Time-lag in multivariate autoregressive time-series model.
+    macro_func_mvar : function, optional
+        Function to compute the macro variable from a 2-by-npoints array.
+    micro_func_mvar : function, optional
+        Function to compute the micro variables from a 2-by-npoints array.
+    seed : integer, optional
+        Seed for numpy.random.default_rng(). The default is 1.
+
+    Returns
+    -------
+    configs : list of tuples
+        (coupling, noise_corr) of each configuration, in itertools.product order.
+    data_dicts : list of dictionaries
+        Data dictionary of each configuration, as returned by generate_2node_mvar_data(). 
+        The micro time-series are views into one C-by-2-by-npoints array.
+
+    """
+    
+    configs = list(product(np.ravel(coupling), np.ravel(noise_corr)))
+    sim_data = _sim_2node_mvar_batch([c for c, _ in configs], [n for _, n in configs], npoints, 
+                                     time_lag_for_model, seed=seed)
+    data_dicts = [_2node_mvar_data_dict(data, macro_func_mvar, micro_func_mvar) for data in sim_data]
+    
+    return configs, data_dicts
+
+def _sim_2node_mvar_batch(couplings, noise_corrs, npoints, time_lag_for_model, seed = 1):
+    # C-by-2-by-npoints time-series of the 2-node MVAR model of every (couplings[c], 
+    # noise_corrs[c]) configuration, simulated at once
+    coupling_matrices = np.array([np.full((2, 2), float(c)) for c in couplings])
+    return sim_mvar_networks(int(npoints), noise_corrs, coupling_matrices, int(time_lag_for_model), seed=seed)
+
 
 # FINAL GOAL: generate data for all other models as well
 # def generate_8node_mvar_global_coup_data(coupling = None, npoints = None, time_lag = None, 
@@ -0,0 +1,169 @@
+"""
+Shared, lazily started MATLAB engine.
+
+Importing complexpy does not start MATLAB. The first function that needs the
+MATLAB backend starts one engine, which is then shared by all modules of the
+package and shut down when the interpreter exits. The MATLAB paths and the JIDT
+jar are set up once, when the engine is started, so that MATLAB-backed
+functions only run the computation itself.
+
+Functions:
+  get_engine - return the shared MATLAB engine, starting it on first use
+  engine_running - whether the shared engine has been started
+  engine_healthy - whether the shared engine responds and finds all MATLAB code
+  shutdown_engine - quit the shared MATLAB engine
+  to_matlab - pass a NumPy array (or scalar) to MATLAB without a list round-trip
+  from_matlab - view a MATLAB array returned by the engine as a NumPy array
+"""
+
+import atexit
+import os
+import threading
+
+import numpy as np
+
+# Calculate absolute paths to MATLAB code directories
+_module_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(os.path.dirname(_module_dir))
+_phiid_path = os.path.join(_project_root, 'src', 'phiid')
+_shannon_wpe_path = os.path.join(_project_root, 'src', 'shannon_wpe')
+_infodynamics_jar_path = os.path.join(_phiid_path, 'infodynamics.jar')
+
+# MATLAB functions called by complexpy, and the JIDT class used by PhiIDFull.m
+_matlab_functions = ['PhiIDFull', 'PhiIDFullDiscrete', 'sim_mvar_network', 'EmergencePsi', 'EmergenceDelta', 'EmergenceGamma']
+_jidt_class = 'infodynamics.measures.continuous.gaussian.IntegratedInformationCalculatorGaussian'
+
+_engine = None
+_lock = threading.Lock()
+
+
+def _init_session(eng):
+    # add the MATLAB code directories to the path, and JIDT to the Java class path
+    # unless it is already there (javaaddpath would otherwise clear Java state)
+    eng.addpath(_phiid_path, _shannon_wpe_path, nargout=0)
+    if not _jidt_loaded(eng):
+        eng.javaaddpath(_infodynamics_jar_path, '-end', nargout=0)
+
+
+def _jidt_loaded(eng):
+    return eng.exist(_jidt_class, 'class', nargout=1) == 8
+
+
+def get_engine(check=False):
+    """
+    Purpose : Return the shared MATLAB engine, starting it on first use.
+
+    Parameters
+    ----------
+    check : bool, optional
+        If True, run engine_healthy() and replace an engine that has died or lost
+        its session state by a new one. The default is False.
+
+    Returns
+    -------
+    eng : matlab.engine.MatlabEngine
+        Engine shared by all MATLAB-backed functions of complexpy, with the paths
+        to the MATLAB code and JIDT set up.
+
+    """
+
+    global _engine
+
+    if check and _engine is not None and not engine_healthy():
+        shutdown_engine()
+
+    with _lock:
+        if _engine is None:
+            # imported here so that the package can be used without MATLAB
+            import matlab.engine
+
+            eng = matlab.engine.start_matlab()
+            _init_session(eng)
+            _engine = eng
+            atexit.register(shutdown_engine)
+
+    return _engine
+
+
+def engine_running():
+    """
+    Purpose : Check whether the shared MATLAB engine has been started.
+    """
+
+    return _engine is not None
+
+
+def engine_healthy():
+    """
+    Purpose : Check that the shared engine responds and finds the MATLAB code and JIDT.
+    """
+
+    eng = _engine
+    if eng is None:
+        return False
+
+    try:
+        return (all(eng.exist(name, nargout=1) == 2 for name in _matlab_functions)
+                and _jidt_loaded(eng))
+    except Exception:
+        # e.g. matlab.engine.EngineError if the MATLAB process has died
+        return False
+
+
+def shutdown_engine():
+    """
+    Purpose : Quit the shared MATLAB engine; the next get_engine() starts a new one.
+    """
+
+    global _engine
+
+    with _lock:
+        if _engine is None:
+            return
+        eng, _engine = _engine, None
+
+    atexit.unregister(shutdown_engine)
+    try:
+        eng.quit()
+    except Exception:
+        # the engine process may already be gone (e.g. killed at interpreter exit)
+        pass
+
+
+def to_matlab(x):
+    """
+    Purpose : Convert a NumPy array (or scalar) to a MATLAB double.
+
+    matlab.double reads buffer-protocol objects directly, so the array is handed
+    over as one contiguous float64 buffer instead of as nested lists of Python
+    floats (as matlab.double(x.tolist()) does).
+
+    Parameters
+    ----------
+    x : array_like or scalar
+        Data to be passed to a MATLAB function.
+
+    Returns
+    -------
+    mx : matlab.double or float
+        MATLAB array with the same shape as x; scalars are returned as float,
+        which the engine passes as a MATLAB double.
+
+    """
+
+    if np.ndim(x) == 0:
+        return float(x)
+
+    import matlab
+
+    return matlab.double(np.ascontiguousarray(x, dtype=np.float64))
+
+
+def from_matlab(mx):
+    """
+    Purpose : Convert a MATLAB double returned by the engine to a NumPy array.
+
+    Uses the buffer protocol of matlab.double, i.e. no conversion to nested lists.
+    """
+
+    return np.asarray(mx, dtype=np.float64)
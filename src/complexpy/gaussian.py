@@ -0,0 +1,646 @@
+"""
+Gaussian information-theoretic primitives for the native (NumPy) backend.
+
+Functions:
+  standardize - scale every variable of a data matrix to unit variance
+  lagged_covariance - covariance of [X_t; X_t+tau] from a data matrix
+  sliding_windows - start indices of sliding windows over a time-series
+  sliding_lagged_covariance - lagged covariance in each sliding window, updated incrementally
+  correlation - correlation matrix of a covariance matrix
+  logdet - log-determinant of a positive definite matrix
+  entropy - differential entropy of a Gaussian sub-block
+  local_entropy - per-sample entropy (-log pdf) of a Gaussian sub-block
+  mutual_info - mutual information between two Gaussian sub-blocks
+  minimum_information_bipartition - MIB of a system given its lagged covariance
+
+Classes:
+  LaggedMoments - running lagged covariance of a time-series given chunk by chunk
+  GaussianStats - lagged covariances, entropies and MIBs of one dataset, shared by all measures
+"""
+
+from itertools import combinations
+
+import numpy as np
+from scipy.linalg import cholesky, solve_triangular
+
+_LOG_2PI = np.log(2 * np.pi)
+
+
+def standardize(X):
+    """
+    Purpose : Scale each row of a data matrix to unit variance.
+
+    Parameters
+    ----------
+    X : float array
+        D-by-T data matrix (variables are rows, samples are columns).
+
+    Returns
+    -------
+    sX : float array
+        Copy of X where every row has unit (sample) standard deviation.
+
+    """
+
+    return X / X.std(axis=1, ddof=1, keepdims=True)
+
+
+def lagged_covariance(X, tau=1):
+    """
+    Purpose : Compute the time-lagged covariance of a data matrix.
+
+    Parameters
+    ----------
+    X : float array
+        D-by-T data matrix.
+    tau : integer, optional
+        Time-lag between past and future samples. The default is 1.
+
+    Returns
+    -------
+    S : float array
+        2D-by-2D covariance matrix of the stacked variables [X_t; X_t+tau].
+
+    """
+
+    return np.cov(np.vstack([X[:, :-tau], X[:, tau:]]))
+
+
+def sliding_windows(T, window, stride=1):
+    """
+    Purpose : Start indices of the windows of length window, every stride time-steps,
+    that fit into a time-series of length T.
+    """
+
+    return np.arange(0, T - window + 1, stride)
+
+
+def sliding_lagged_covariance(X, tau, window, stride=1, unit_variance=False):
+    """
+    Purpose : Compute the time-lagged covariance in each of a series of sliding windows.
+
+    The sums and cross-products of [X_t; X_t+tau] are updated as the window slides, 
+    by adding the pairs of samples that enter the window and subtracting those that 
+    leave it, so the cost is O(T D^2) over all windows instead of O(window D^2) per 
+    window. Windows that do not overlap, and every 1024th window (to bound the 
+    accumulation of rounding errors), are summed from scratch.
+
+    Parameters
+    ----------
+    X : float array
+        D-by-T data matrix.
+    tau : integer
+        Time-lag between past and future samples.
+    window : integer
+        Number of time-steps per window (i.e. window-tau pairs of samples).
+    stride : integer, optional
+        Number of time-steps between the starts of consecutive windows. The default 
+        is 1.
+    unit_variance : bool, optional
+        If True, scale each window as if its time-series had been standardized first, 
+        i.e. return lagged_covariance(standardize(X[:, s:s+window]), tau). The default 
+        is False.
+
+    Returns
+    -------
+    S : float array
+        n_windows-by-2D-by-2D array where S[k] equals 
+        lagged_covariance(X[:, s:s+window], tau) for the k-th start s of 
+        sliding_windows(T, window, stride).
+
+    """
+
+    D, T = X.shape
+    starts = sliding_windows(T, window, stride)
+    n = window - tau
+
+    # centre the data to avoid cancellation when removing the window means below
+    X = X - X.mean(axis=1, keepdims=True)
+    Y = np.vstack([X[:, :-tau], X[:, tau:]])
+
+    S = np.empty((len(starts), 2 * D, 2 * D))
+    for k, start in enumerate(starts):
+        if k % 1024 == 0 or stride >= n:
+            pairs = Y[:, start:start + n]
+            total = pairs.sum(axis=1)
+            products = pairs @ pairs.T
+        else:
+            # pairs [start-stride, start) leave the window, [end-stride, end) enter it
+            leaving = Y[:, start - stride:start]
+            entering = Y[:, start + n - stride:start + n]
+            total += entering.sum(axis=1) - leaving.sum(axis=1)
+            products += entering @ entering.T - leaving @ leaving.T
+        S[k] = (products - np.outer(total, total) / n) / (n - 1)
+
+    if unit_variance:
+        # standard deviation of each variable over all time-steps of the window
+        csum = np.hstack([np.zeros((D, 1)), np.cumsum(X, axis=1)])
+        csum2 = np.hstack([np.zeros((D, 1)), np.cumsum(X * X, axis=1)])
+        total = csum[:, starts + window] - csum[:, starts]
+        var = (csum2[:, starts + window] - csum2[:, starts] - total ** 2 / window) / (window - 1)
+        d = np.tile(np.sqrt(var).T, 2)
+        S /= d[:, :, None] * d[:, None, :]
+
+    return S
+
+
+class LaggedMoments:
+    """
+    Purpose : Running lagged covariance of a time-series that is given chunk by chunk.
+
+    Keeps the number, mean and co-moments of the pairs [X_t; X_t+tau] and of the
+    single samples X_t seen so far, merging those of each chunk into them (Chan et
+    al.'s pairwise form of Welford's algorithm), together with the last tau samples
+    to pair with the next chunk. Memory is O(D^2 + tau D), independent of the
+    length of the time-series.
+
+    Parameters
+    ----------
+    tau : integer, optional
+        Time-lag between past and future samples. The default is 1.
+
+    Attributes
+    ----------
+    n_samples : integer
+        Number of time-steps seen so far.
+    n_pairs : integer
+        Number of pairs of samples (t, t+tau) seen so far.
+
+    """
+
+    def __init__(self, tau=1):
+        self.tau = tau
+        self.n_samples = 0
+        self.n_pairs = 0
+
+        self._buffer = None
+        self._pair_mean = None
+        self._pair_comoments = None
+        self._sample_mean = None
+        self._sample_m2 = None
+
+    @staticmethod
+    def _merge(n, mean, m2, chunk, outer):
+        # merge the mean and (co-)moments of the rows of chunk into those of n rows
+        m = len(chunk)
+        chunk_mean = chunk.mean(axis=0)
+        centred = chunk - chunk_mean
+        chunk_m2 = centred.T @ centred if outer else np.sum(centred * centred, axis=0)
+        if n == 0:
+            return chunk_mean, chunk_m2
+
+        delta = chunk_mean - mean
+        delta2 = np.outer(delta, delta) if outer else delta * delta
+        return mean + delta * m / (n + m), m2 + chunk_m2 + delta2 * n * m / (n + m)
+
+    def update(self, X):
+        """
+        Purpose : Add a D-by-T_chunk chunk of the time-series.
+        """
+
+        X = np.atleast_2d(np.asarray(X, dtype=float)).T
+        if self._buffer is None:
+            self._buffer = X[:0]
+        elif X.shape[1] != self._buffer.shape[1]:
+            raise ValueError('chunk does not have the same number of variables as previous chunks')
+        if len(X) == 0:
+            return self
+
+        self._sample_mean, self._sample_m2 = self._merge(self.n_samples, self._sample_mean,
+                                                         self._sample_m2, X, outer=False)
+        self.n_samples += len(X)
+
+        tau = self.tau
+        X = np.vstack([self._buffer, X])
+        self._buffer = X[-tau:].copy()
+        if len(X) > tau:
+            pairs = np.hstack([X[:-tau], X[tau:]])
+            self._pair_mean, self._pair_comoments = self._merge(self.n_pairs, self._pair_mean,
+                                                                self._pair_comoments, pairs, outer=True)
+            self.n_pairs += len(pairs)
+
+        return self
+
+    def covariance(self, unit_variance=False):
+        """
+        Purpose : Lagged covariance of all samples seen so far.
+
+        Parameters
+        ----------
+        unit_variance : bool, optional
+            If True, scale the covariance as if the time-series had been standardized
+            first, i.e. return lagged_covariance(standardize(X), tau). The default is
+            False.
+
+        Returns
+        -------
+        S : float array
+            2D-by-2D covariance matrix of [X_t; X_t+tau], as lagged_covariance(X, tau)
+            of the concatenated chunks.
+
+        """
+
+        if self.n_pairs < 2:
+            raise ValueError('less than two pairs of samples (t, t+tau) have been seen')
+
+        S = self._pair_comoments / (self.n_pairs - 1)
+        if unit_variance:
+            d = np.tile(np.sqrt(self._sample_m2 / (self.n_samples - 1)), 2)
+            S = S / np.outer(d, d)
+        return S
+
+
+def correlation(S):
+    """
+    Purpose : Rescale a covariance matrix (or a stack of them) to the correlation 
+    matrix of its variables.
+    """
+
+    d = np.sqrt(np.diagonal(S, axis1=-2, axis2=-1))
+    return S / (d[..., :, None] * d[..., None, :])
+
+
+def logdet(S):
+    """
+    Purpose : Log-determinant of a positive definite matrix via Cholesky.
+    """
+
+    return 2 * np.sum(np.log(np.diag(cholesky(S, lower=True))))
+
+
+def entropy(S, idx):
+    """
+    Purpose : Differential entropy (in nats) of the Gaussian sub-block S[idx, idx].
+    """
+
+    idx = np.asarray(idx)
+    return 0.5 * (len(idx) * (_LOG_2PI + 1) + logdet(S[np.ix_(idx, idx)]))
+
+
+def local_entropy(Z, mu, S, idx):
+    """
+    Purpose : Local entropy -log N(z; mu, S) of each sample of a Gaussian sub-block.
+
+    Parameters
+    ----------
+    Z : float array
+        D-by-T data matrix.
+    mu : float array
+        Mean of each of the D variables.
+    S : float array
+        D-by-D covariance matrix.
+    idx : list of integers
+        Indices of the variables that make up the sub-block.
+
+    Returns
+    -------
+    h : float array
+        Local entropy of each of the T samples.
+
+    """
+
+    idx = np.asarray(idx)
+    L = cholesky(S[np.ix_(idx, idx)], lower=True)
+    y = solve_triangular(L, Z[idx] - mu[idx, None], lower=True)
+    return 0.5 * (len(idx) * _LOG_2PI + 2 * np.sum(np.log(np.diag(L))) + np.sum(y * y, axis=0))
+
+
+def mutual_info(S, src, tgt):
+    """
+    Purpose : Mutual information (in nats) between two Gaussian sub-blocks of S.
+    """
+
+    return entropy(S, src) + entropy(S, tgt) - entropy(S, list(src) + list(tgt))
+
+
+# largest number of variables for which minimum_information_bipartition() searches 
+# all bipartitions by default
+_MIB_EXHAUSTIVE_MAX = 16
+
+
+def _entropies(n, logdets):
+    # Gaussian entropy of n variables from the log-determinant of their covariance
+    return 0.5 * (n * (_LOG_2PI + 1) + logdets)
+
+
+def _mib_scores(system_mi, logdets1, logdets2, n1, n2):
+    # normalised effective information of bipartitions, from the log-determinants of the
+    # past, future and joint (past and future) blocks of both parts
+    h1 = [_entropies(n, logdets) for n, logdets in zip([n1, n1, 2 * n1], logdets1)]
+    h2 = [_entropies(n, logdets) for n, logdets in zip([n2, n2, 2 * n2], logdets2)]
+    parts_mi = (h1[0] + h1[1] - h1[2]) + (h2[0] + h2[1] - h2[2])
+    return (system_mi - parts_mi) / np.minimum(h1[0], h2[0])
+
+
+def _batch_logdets(S, parts):
+    # log-determinants of the past, future and joint blocks of each row of parts
+    D = S.shape[0] // 2
+    logdets = []
+    for idx in [parts, parts + D, np.hstack([parts, parts + D])]:
+        L = np.linalg.cholesky(S[idx[:, :, None], idx[:, None, :]])
+        logdets.append(2 * np.sum(np.log(np.diagonal(L, axis1=1, axis2=2)), axis=1))
+    return logdets
+
+
+def _exhaustive_mib(S, system_mi):
+    # all bipartitions, batched by the size of the smaller part, in the order of
+    # combinations() so that ties are resolved towards the first one
+    D = S.shape[0] // 2
+    best_score, best_part = np.inf, None
+    for size in range(1, D // 2 + 1):
+        # every bipartition is visited once: for even splits skip the mirror image
+        parts = np.array([part for part in combinations(range(D), size) 
+                          if 2 * size != D or part[0] == 0])
+        in_part = np.zeros((len(parts), D), dtype=bool)
+        np.put_along_axis(in_part, parts, True, axis=1)
+        rests = np.nonzero(~in_part)[1].reshape(len(parts), D - size)
+
+        scores = _mib_scores(system_mi, _batch_logdets(S, parts), _batch_logdets(S, rests),
+                             size, D - size)
+        if np.all(np.isnan(scores)):
+            continue
+        k = np.nanargmin(scores)
+        if scores[k] < best_score:
+            best_score, best_part = scores[k], parts[k]
+
+    return np.isin(np.arange(D), best_part)
+
+
+def _block_inverses(S, part):
+    # log-determinants and inverses of the past, future and joint blocks of a part
+    D = S.shape[0] // 2
+    blocks = []
+    for idx in [part, part + D, np.concatenate([part, part + D])]:
+        L = cholesky(S[np.ix_(idx, idx)], lower=True)
+        L_inv = solve_triangular(L, np.eye(len(idx)), lower=True)
+        blocks.append((2 * np.sum(np.log(np.diag(L))), L_inv.T @ L_inv))
+    return blocks
+
+
+def _logdets_removed(blocks, n):
+    # log-determinants of the blocks of a part of n variables without each of them: 
+    # det(S[A-i, A-i]) = det(S[A, A]) * det(inv(S[A, A])[i, i])
+    (ld_past, K_past), (ld_future, K_future), (ld_joint, K_joint) = blocks
+    d = np.arange(n)
+    return [ld_past + np.log(np.diag(K_past)), ld_future + np.log(np.diag(K_future)),
+            ld_joint + np.log(K_joint[d, d] * K_joint[d + n, d + n] - K_joint[d, d + n] ** 2)]
+
+
+def _logdets_added(S, blocks, part, new):
+    # log-determinants of the blocks of part with each of the variables new added: 
+    # det(S[A+j, A+j]) = det(S[A, A]) * det(Schur complement of S[A, A])
+    D = S.shape[0] // 2
+    (ld_past, K_past), (ld_future, K_future), (ld_joint, K_joint) = blocks
+
+    schur = []
+    for rows, cols, K in [(new, part, K_past), (new + D, part + D, K_future)]:
+        C = S[np.ix_(rows, cols)]
+        schur.append(S[rows, rows] - np.sum((C @ K) * C, axis=1))
+
+    joint = np.concatenate([part, part + D])
+    C_past, C_future = S[np.ix_(new, joint)], S[np.ix_(new + D, joint)]
+    X_past, X_future = C_past @ K_joint, C_future @ K_joint
+    a = S[new, new] - np.sum(X_past * C_past, axis=1)
+    b = S[new, new + D] - np.sum(X_past * C_future, axis=1)
+    c = S[new + D, new + D] - np.sum(X_future * C_future, axis=1)
+
+    return [ld_past + np.log(schur[0]), ld_future + np.log(schur[1]), ld_joint + np.log(a * c - b * b)]
+
+
+def _local_search_mib(S, system_mi, in_part, max_moves):
+    # Kernighan-Lin-style search: move the single variable whose move scores best (all
+    # moves are scored at once from the inverses of the current blocks), also if the
+    # score increases, and lock it until a better bipartition is found; stop after
+    # min(D, 32) moves without improvement
+    D = S.shape[0] // 2
+    best_score, best_part = np.inf, in_part
+    locked = np.zeros(D, dtype=bool)
+    for _ in range(max_moves):
+        if np.sum(locked) >= 32:
+            break
+        p1, p2 = np.flatnonzero(in_part), np.flatnonzero(~in_part)
+        blocks1, blocks2 = _block_inverses(S, p1), _block_inverses(S, p2)
+        n1, n2 = len(p1), len(p2)
+        score = _mib_scores(system_mi, [[ld] for ld, _ in blocks1], [[ld] for ld, _ in blocks2],
+                            n1, n2)[0]
+        if score < best_score - 1e-12 * abs(score):
+            best_score, best_part = score, in_part
+            locked[:] = False
+
+        moves, scores = [], []
+        if n1 > 1:
+            moves.append(p1)
+            scores.append(_mib_scores(system_mi, _logdets_removed(blocks1, n1),
+                                      _logdets_added(S, blocks2, p2, p1), n1 - 1, n2 + 1))
+        if n2 > 1:
+            moves.append(p2)
+            scores.append(_mib_scores(system_mi, _logdets_added(S, blocks1, p1, p2),
+                                      _logdets_removed(blocks2, n2), n1 + 1, n2 - 1))
+        if not moves:
+            break
+        moves, scores = np.concatenate(moves), np.concatenate(scores)
+        scores[locked[moves] | np.isnan(scores)] = np.inf
+        if np.all(np.isinf(scores)):
+            break
+
+        k = np.argmin(scores)
+        locked[moves[k]] = True
+        in_part = in_part.copy()
+        in_part[moves[k]] = not in_part[moves[k]]
+
+    return best_score, best_part
+
+
+def _heuristic_mib(S, system_mi):
+    # local search from a balanced spectral bipartition (of the absolute correlations
+    # within and across time) and from the best single-variable part
+    D = S.shape[0] // 2
+    R = np.abs(correlation(S))
+    A = R[:D, :D] + 0.5 * (R[:D, D:] + R[D:, :D])
+    np.fill_diagonal(A, 0)
+    _, vectors = np.linalg.eigh(np.diag(A.sum(axis=1)) - A)
+    spectral = np.zeros(D, dtype=bool)
+    spectral[np.argsort(vectors[:, 1])[:D // 2]] = True
+
+    # single-variable parts, with the rest of the system from the inverses of its blocks
+    d = np.arange(D)
+    singles = [np.log(S[d, d]), np.log(S[d + D, d + D]), np.log(S[d, d] * S[d + D, d + D] - S[d, d + D] ** 2)]
+    rests = _logdets_removed(_block_inverses(S, d), D)
+    scores = _mib_scores(system_mi, singles, rests, 1, D - 1)
+    single = np.arange(D) == np.nanargmin(scores)
+
+    results = [_local_search_mib(S, system_mi, start, max_moves=4 * D) for start in [spectral, single]]
+    return min(results, key=lambda result: result[0])[1]
+
+
+def minimum_information_bipartition(S, exhaustive=None):
+    """
+    Purpose : Find the minimum information bipartition (MIB) of a system.
+
+    Mirrors JIDT's IntegratedInformationCalculatorGaussian: for every bipartition
+    the effective information I(X_t; X_t+tau) - sum_k I(M^k_t; M^k_t+tau) is
+    normalised by the smallest entropy of the parts, and the bipartition with
+    the lowest normalised value is returned.
+
+    The exhaustive search scores all bipartitions with the same number of variables
+    at once, from batched Cholesky factorisations of their sub-blocks. For larger 
+    systems, a local search moves single variables between the parts; the 
+    log-determinants after every possible move follow from the inverses of the 
+    current blocks (Schur complements), so one step costs O(D^3) for all D moves.
+
+    Parameters
+    ----------
+    S : float array
+        2D-by-2D lagged covariance of [X_t; X_t+tau], e.g. from lagged_covariance().
+    exhaustive : bool, optional
+        If True, search all 2^(D-1)-1 bipartitions; if False, use the local search, 
+        which may return a bipartition whose value is not the lowest. The default is 
+        None (exhaustive for D <= 16).
+
+    Returns
+    -------
+    p1, p2 : lists of integers
+        Indices of the two parts; p1 always contains variable 0.
+
+    """
+
+    D = S.shape[0] // 2
+    if D < 2:
+        raise ValueError('the MIB is not defined for systems with less than two variables')
+    if exhaustive is None:
+        exhaustive = D <= _MIB_EXHAUSTIVE_MAX
+
+    past = list(range(D))
+    system_mi = mutual_info(S, past, [i + D for i in past])
+
+    in_part = _exhaustive_mib(S, system_mi) if exhaustive else _heuristic_mib(S, system_mi)
+    if not in_part[0]:
+        in_part = ~in_part
+    return [int(i) for i in np.flatnonzero(in_part)], [int(i) for i in np.flatnonzero(~in_part)]
+
+
+class GaussianStats:
+    """
+    Purpose : Gaussian statistics of one dataset, computed once and shared by all measures.
+
+    Holds the lagged covariance of [micro, macro] for every time-lag that a measure
+    asks for, the standard deviations of the variables, the entropies (log-
+    determinants) of sub-blocks of the standardized micro covariance and its MIB. 
+    Everything is computed on first use and cached, so that e.g. phiid_wpe() and 
+    shannon_wpe() for several time-lags and redundancy functions share one pass over 
+    the data per time-lag, and only add their own algebra. compute_emergence() puts 
+    one GaussianStats into each simulated data_dict (key 'gaussian_stats').
+
+    Parameters
+    ----------
+    micro : float array
+        D-by-T time-series of micro variables.
+    macro : float array, optional
+        Time-series of the macro variable, of shape (T,) or (1, T). The default is None.
+
+    """
+
+    def __init__(self, micro, macro=None):
+        self.micro = np.asarray(micro, dtype=float)
+        self.n_micro = self.micro.shape[0]
+        self.macro = None
+        if macro is not None:
+            macro = np.asarray(macro, dtype=float)
+            if macro.shape not in [(self.micro.shape[1],), (1, self.micro.shape[1])]:
+                raise ValueError(f'macro has shape {macro.shape} instead of '
+                                 f'({self.micro.shape[1]},) or (1, {self.micro.shape[1]})')
+            self.macro = macro.ravel()
+
+        # [micro; macro], stacked once for all time-lags
+        self._data = self.micro if self.macro is None else np.vstack([self.micro, self.macro])
+
+        self._std = None
+        self._covariances = {}
+        self._micro_covariances = {}
+        self._entropies = {}
+        self._bipartitions = {}
+
+    def std(self):
+        """
+        Purpose : Sample standard deviation of each micro (and macro) variable.
+        """
+
+        if self._std is None:
+            self._std = self._data.std(axis=1, ddof=1)
+        return self._std
+
+    def _lagged_covariance(self, tau):
+        if tau not in self._covariances:
+            self._covariances[tau] = lagged_covariance(self._data, tau)
+        return self._covariances[tau]
+
+    def lagged_covariance(self, tau, unit_variance=False):
+        """
+        Purpose : Lagged covariance of the micro variables.
+
+        Parameters
+        ----------
+        tau : integer
+            Time-lag between past and future samples.
+        unit_variance : bool, optional
+            If True, scale it as lagged_covariance(standardize(micro), tau). The 
+            default is False.
+
+        Returns
+        -------
+        S : float array
+            2D-by-2D covariance matrix of [micro_t; micro_t+tau]. With unit_variance, 
+            the cached (read-only) matrix.
+
+        """
+
+        if unit_variance:
+            if tau not in self._micro_covariances:
+                S = self.lagged_covariance(tau)
+                d = np.tile(self.std()[:self.n_micro], 2)
+                S = S / np.outer(d, d)
+                S.setflags(write=False)
+                self._micro_covariances[tau] = S
+            return self._micro_covariances[tau]
+
+        D, N = self.n_micro, self._data.shape[0]
+        idx = np.r_[0:D, N:N + D]
+        return self._lagged_covariance(tau)[np.ix_(idx, idx)]
+
+    def lagged_correlation(self, tau):
+        """
+        Purpose : Correlation between [micro, macro] at t and at t+tau.
+
+        Returns
+        -------
+        R : float array
+            (D+1)-by-(D+1) matrix as shannon.lagged_correlation() of [micro, macro].
+
+        """
+
+        if self.macro is None:
+            raise ValueError('GaussianStats has no macro variable')
+
+        N = self.n_micro + 1
+        return correlation(self._lagged_covariance(tau))[:N, N:]
+
+    def entropy(self, tau, idx):
+        """
+        Purpose : Entropy of a sub-block of lagged_covariance(tau, unit_variance=True), cached.
+        """
+
+        # the log-determinant does not depend on the order of the variables
+        key = (tau, tuple(sorted(int(i) for i in idx)))
+        if key not in self._entropies:
+            self._entropies[key] = entropy(self.lagged_covariance(tau, unit_variance=True), list(key[1]))
+        return self._entropies[key]
+
+    def minimum_information_bipartition(self, tau):
+        """
+        Purpose : MIB of lagged_covariance(tau, unit_variance=True), cached.
+        """
+
+        if tau not in self._bipartitions:
+            self._bipartitions[tau] = minimum_information_bipartition(
+                self.lagged_covariance(tau, unit_variance=True))
+        return self._bipartitions[tau]
@@ -0,0 +1,133 @@
+"""
+In-process I_dep double-redundancy of binary two-source, two-target systems.
+
+This is a port of src/phiid/private/idep_dit.py, which MATLAB launches as a
+separate Python process per dataset, passing the data as a string in argv and
+reading the result from stdout. Here the data is passed as integer arrays or as
+probability vectors of the 16 joint outcomes, a whole batch of distributions is
+evaluated in one call, and dit is imported once. Distributions that occur more
+than once in a batch are evaluated once.
+
+Requires the dit package (imported on first use, so that complexpy can be used
+without it).
+
+Functions:
+  outcome_probabilities - probabilities of the 16 joint outcomes of binary sources and targets
+  idep_double_redundancy - I_dep double-redundancy (rtr) of a batch of distributions
+"""
+
+import numpy as np
+
+# outcomes of [X1_t, X2_t, X1_t+tau, X2_t+tau], ordered as in idep_dit.py: outcome i
+# is the binary representation of i, with X1_t as the most significant bit
+_outcomes = [format(i, '04b') for i in range(16)]
+
+
+def outcome_probabilities(X, tau=1):
+    """
+    Purpose : Probabilities of the 16 joint outcomes of two binary variables at t and t+tau.
+
+    Parameters
+    ----------
+    X : integer array
+        2-by-T binary time-series, or B-by-2-by-T batch of them.
+    tau : integer, optional
+        Time-lag between sources (t) and targets (t+tau). The default is 1.
+
+    Returns
+    -------
+    p : float array
+        Vector of length 16 (or B-by-16 array) where p[i] is the frequency of the
+        outcome whose bits (X1_t, X2_t, X1_t+tau, X2_t+tau) spell i.
+
+    """
+
+    X = np.asarray(X)
+    if X.ndim not in (2, 3) or X.shape[-2] != 2:
+        raise ValueError('X is neither 2-by-T nor B-by-2-by-T')
+    if type(tau) != int or tau < 1 or tau >= X.shape[-1]:
+        raise ValueError('tau either is not int, or it is not between 1 and T-1')
+    if not np.isin(X, [0, 1]).all():
+        raise ValueError('X is not binary')
+
+    batch = X.reshape(-1, 2, X.shape[-1]).astype(np.int64)
+    codes = 8 * batch[:, 0, :-tau] + 4 * batch[:, 1, :-tau] + 2 * batch[:, 0, tau:] + batch[:, 1, tau:]
+
+    # one bincount over the whole batch, with the outcomes of distribution b offset by 16*b
+    offsets = 16 * np.arange(len(batch))[:, None]
+    p = np.bincount((codes + offsets).ravel(), minlength=16 * len(batch)).reshape(-1, 16)
+    p = p / codes.shape[1]
+
+    return p[0] if X.ndim == 2 else p
+
+
+def _node(*constraints):
+    # lattice node (set of marginal constraints) in dit's frozenset representation
+    return frozenset(frozenset(c) for c in constraints)
+
+
+def _idep_rtr(dit, p):
+    # rtr of one 16-outcome distribution from its I_dep dependency lattice (see
+    # discrete_idep_single_lattice() in idep_dit.py with idep_atom '02')
+    measure = {'I': lambda d: dit.multivariate.coinformation(d, [[0, 1], [2, 3]])}
+    dd = dit.profiles.DependencyDecomposition(dit.Distribution(_outcomes, p), measures=measure)
+
+    def min_delta(constraint, given=None):
+        # smallest gain of I along the lattice edges that add constraint
+        return min(dd.delta(e, 'I') for e in dd.edges(_node(constraint))
+                   if given is None or frozenset(given) in e[0])
+
+    Ixa = dd.atoms[_node((0, 2), (1,), (3,))]['I']
+    Ux_xyta = min_delta((0, 2), given=(3,))
+    Ua_abtx = min_delta((0, 2), given=(1,))
+
+    # the PhiID unique information xta; negative values are numerical errors of the
+    # maximum-entropy projections
+    xta = max(min_delta((0, 2)), 0)
+
+    # rtr + rta + xtr + xta = Ixa, with rta = Ua_abtx - xta and xtr = Ux_xyta - xta
+    return float(Ixa - Ua_abtx - Ux_xyta + xta)
+
+
+def idep_double_redundancy(p=None, X=None, tau=1):
+    """
+    Purpose : Compute the I_dep double-redundancy (rtr) of a batch of distributions.
+
+    Either p or X must be given.
+
+    Parameters
+    ----------
+    p : float array, optional
+        Probability vector of the 16 joint outcomes (see outcome_probabilities()),
+        or B-by-16 array of them.
+    X : integer array, optional
+        2-by-T binary time-series, or B-by-2-by-T batch of them.
+    tau : integer, optional
+        Time-lag between sources and targets, only used with X. The default is 1.
+
+    Returns
+    -------
+    rtr : float or float array
+        Double-redundancy (in bits) of each distribution; float for a single one.
+
+    """
+
+    if (p is None) == (X is None):
+        raise ValueError('either p or X must be given')
+    if p is None:
+        p = outcome_probabilities(X, tau)
+
+    p = np.asarray(p, dtype=float)
+    if p.shape[-1] != 16 or p.ndim not in (1, 2):
+        raise ValueError('p is neither a vector of length 16 nor a B-by-16 array')
+    if (p < 0).any() or not np.allclose(p.sum(axis=-1), 1):
+        raise ValueError('p is not a probability distribution')
+
+    # imported here so that the package can be used without dit
+    import dit
+
+    # evaluate each distinct distribution once
+    distinct, inverse = np.unique(np.atleast_2d(p), axis=0, return_inverse=True)
+    rtr = np.array([_idep_rtr(dit, q) for q in distinct])[inverse.ravel()]
+
+    return float(rtr[0]) if p.ndim == 1 else rtr
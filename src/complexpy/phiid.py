@@ -0,0 +1,457 @@
+"""
+Native (NumPy) implementation of the Gaussian Integrated Information Decomposition.
+
+This is a port of src/phiid/PhiIDFull.m (together with RedundancyMMI/CCS and
+DoubleRedundancyMMI/CCS) which runs in-process, without a MATLAB engine.
+
+Functions:
+  phiid_full - average (and local) PhiID atoms of a D-by-T data matrix
+  phiid_local_atoms - local PhiID atoms, computed chunk-wise into a (memory-mapped) array
+  phiid_average - average PhiID atoms straight from a lagged covariance matrix
+  phiid_average_from_stats - average PhiID atoms from the (cached) statistics of a dataset
+"""
+
+import warnings
+
+import numpy as np
+
+from .gaussian import standardize, lagged_covariance, entropy, local_entropy, \
+    minimum_information_bipartition
+
+# atom names in the order of the columns of _M (see PhiIDFull.m)
+ATOM_NAMES = ['rtr', 'rtx', 'rty', 'rts', 'xtr', 'xtx', 'xty', 'xts',
+              'ytr', 'ytx', 'yty', 'yts', 'str', 'stx', 'sty', 'sts']
+
+RED_FUNCS = ['mmi', 'ccs']
+
+# each row corresponds to one of the 16 PhiID quantities (rtr, Rxyta, Rxytb, Rxytab,
+# Rabtx, Rabty, Rabtxy, Ixta, Ixtb, Iyta, Iytb, Ixyta, Ixytb, Ixtab, Iytab, Ixytab), each
+# column to one PhiID atom
+_M = np.array([[1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
+               [1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
+               [1, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0],
+               [1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0],
+               [1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0, 1, 1, 0, 0],
+               [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0],
+               [1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+               [1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0],
+               [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]], dtype=float)
+_M_INV = np.linalg.inv(_M)
+
+# -----------------------------------------------------------------------------
+# REDUNDANCY FUNCTIONS
+# -----------------------------------------------------------------------------
+
+
+def _finite_mean(x):
+    return np.mean(x[np.isfinite(x)])
+
+
+def _redundancy_ccs(mi1, mi2, mi12):
+    c = mi12 - mi1 - mi2
+    signs = np.sign([mi1, mi2, mi12, -c])
+    return np.all(signs == signs[0], axis=0) * -c
+
+
+def _sample_means(mis):
+    # mean(key, mask_key) is the mean of mis[key] over the samples where mis[mask_key]
+    # is finite (over all samples if mask_key is None)
+    def mean(key, mask_key=None):
+        if mask_key is None:
+            return np.mean(mis[key])
+        return np.mean(mis[key][np.isfinite(mis[mask_key])])
+    return mean
+
+
+def _redundancy_mmi(mis, mean, k1, k2, k12):
+    # the mutual information that is smaller on average
+    return mis[k1] if mean(k1) < mean(k2) else mis[k2]
+
+
+def _double_redundancy_mmi(mis, mean):
+    # minimum (on average) of I(x;a), I(x;b), I(y;a), I(y;b)
+    redred = 'Ixta'
+    for key in ['Ixtb', 'Iyta', 'Iytb']:
+        if mean(key, key) < mean(redred, key):
+            redred = key
+    return mis[redred]
+
+
+def _double_redundancy_ccs(mis, reds):
+    # this quantity equals redred - synsyn
+    double_coinfo = (- mis['Ixta'] - mis['Ixtb'] - mis['Iyta'] - mis['Iytb']
+                     + mis['Ixtab'] + mis['Iytab'] + mis['Ixyta'] + mis['Ixytb'] - mis['Ixytab']
+                     + reds['Rxyta'] + reds['Rxytb'] - reds['Rxytab']
+                     + reds['Rabtx'] + reds['Rabty'] - reds['Rabtxy'])
+    signs = np.sign([mis['Ixta'], mis['Ixtb'], mis['Iyta'], mis['Iytb'], double_coinfo])
+    return np.all(signs == signs[0], axis=0) * double_coinfo
+
+# -----------------------------------------------------------------------------
+# PHIID
+# -----------------------------------------------------------------------------
+
+
+def _mutual_infos(h):
+    """
+    Purpose : Mutual informations needed for PhiID, from the 15 joint entropies.
+
+    Parameters
+    ----------
+    h : list
+        Entropy of every non-empty subset of {X1, X2, Y1, Y2}, indexed by bitmask
+        (bit 0: X1, bit 1: X2, bit 2: Y1, bit 3: Y2).
+
+    Returns
+    -------
+    mis : dictionary
+        Mutual informations Ixta, ..., Ixytab.
+
+    """
+
+    return {'Ixta': h[1] + h[4] - h[5],
+            'Ixtb': h[1] + h[8] - h[9],
+            'Iyta': h[2] + h[4] - h[6],
+            'Iytb': h[2] + h[8] - h[10],
+            'Ixyta': h[3] + h[4] - h[7],
+            'Ixytb': h[3] + h[8] - h[11],
+            'Ixtab': h[1] + h[12] - h[13],
+            'Iytab': h[2] + h[12] - h[14],
+            'Ixytab': h[3] + h[12] - h[15]}
+
+
+def _subset_indices(groups, mask):
+    return [i for g in range(4) if mask & (1 << g) for i in groups[g]]
+
+
+def _local_mutual_infos(Z, groups, mu=None, S=None):
+    """
+    Purpose : Local (per-sample) mutual informations of the stacked data [X1; X2; Y1; Y2].
+
+    The mean mu and covariance S default to those of Z; pass them to evaluate a chunk
+    of samples under the distribution of the full data.
+    """
+
+    mu = Z.mean(axis=1) if mu is None else mu
+    S = np.cov(Z) if S is None else S
+
+    return _mutual_infos([None] + [local_entropy(Z, mu, S, _subset_indices(groups, mask))
+                                   for mask in range(1, 16)])
+
+
+def _local_atoms(mis, red_func, mean=None, rows=None):
+    """
+    Purpose : Solve the PhiID system of equations for local atoms.
+
+    MMI compares mutual informations on average; mean (see _sample_means) gives these
+    averages, and defaults to the means over the samples in mis. rows selects atoms
+    (as indices into ATOM_NAMES).
+    """
+
+    if red_func == 'mmi':
+        mean = _sample_means(mis) if mean is None else mean
+        RedFun = lambda k1, k2, k12: _redundancy_mmi(mis, mean, k1, k2, k12)
+    else:
+        RedFun = lambda k1, k2, k12: _redundancy_ccs(mis[k1], mis[k2], mis[k12])
+
+    reds = {'Rxyta': RedFun('Ixta', 'Iyta', 'Ixyta'),
+            'Rxytb': RedFun('Ixtb', 'Iytb', 'Ixytb'),
+            'Rxytab': RedFun('Ixtab', 'Iytab', 'Ixytab'),
+            'Rabtx': RedFun('Ixta', 'Ixtb', 'Ixtab'),
+            'Rabty': RedFun('Iyta', 'Iytb', 'Iytab'),
+            'Rabtxy': RedFun('Ixyta', 'Ixytb', 'Ixytab')}
+
+    if red_func == 'mmi':
+        rtr = _double_redundancy_mmi(mis, mean)
+    else:
+        rtr = _double_redundancy_ccs(mis, reds)
+
+    quantities = np.vstack([rtr, reds['Rxyta'], reds['Rxytb'], reds['Rxytab'],
+                            reds['Rabtx'], reds['Rabty'], reds['Rabtxy'],
+                            mis['Ixta'], mis['Ixtb'], mis['Iyta'], mis['Iytb'],
+                            mis['Ixyta'], mis['Ixytb'], mis['Ixtab'], mis['Iytab'],
+                            mis['Ixytab']])
+
+    return (_M_INV if rows is None else _M_INV[rows]) @ quantities
+
+
+def _mib_order(S, bipartition=None):
+    """
+    Purpose : Order the variables of a lagged covariance as [X1; X2; Y1; Y2] across the MIB
+    (or across bipartition, if given).
+
+    Returns
+    -------
+    order : list of integers
+        Row indices of [X_t; X_t+tau] sorted into past and future of both parts.
+    groups : list of 4 lists of integers
+        Positions of X1, X2, Y1 and Y2 in the reordered variables.
+
+    """
+
+    D = S.shape[0] // 2
+    p1, p2 = minimum_information_bipartition(S) if bipartition is None else bipartition
+    order = p1 + p2 + [i + D for i in p1] + [i + D for i in p2]
+
+    n1, n2 = len(p1), len(p2)
+    groups = [list(range(0, n1)),
+              list(range(n1, n1 + n2)),
+              list(range(n1 + n2, 2 * n1 + n2)),
+              list(range(2 * n1 + n2, 2 * (n1 + n2)))]
+
+    return order, groups
+
+
+def _stacked_data(X, tau):
+    """
+    Purpose : Stack past and future of both parts of the MIB as [X1; X2; Y1; Y2].
+
+    Returns
+    -------
+    Z : float array
+        Unit-variance stacked data with T-tau samples.
+    groups : list of 4 lists of integers
+        Rows of X1, X2, Y1 and Y2 in Z.
+
+    """
+
+    D, T = X.shape
+    if T <= D:
+        raise ValueError(f'data has {D} dimensions and {T} time-steps; '
+                         f'you may have forgotten to transpose the matrix')
+
+    # scale to unit variance (for numerical stability), find the MIB and stack past
+    # and future of both parts
+    sX = standardize(X)
+    order, groups = _mib_order(lagged_covariance(sX, tau))
+    Z = standardize(np.vstack([sX[:, :-tau], sX[:, tau:]])[order])
+
+    return Z, groups
+
+
+def phiid_full(X, tau=1, red_func='mmi'):
+    """
+    Purpose : Compute the full PhiID decomposition of Gaussian data.
+
+    Parameters
+    ----------
+    X : float array
+        D-by-T data matrix of D dimensions for T time-steps. If D > 2, PhiID is
+        computed across the minimum information bipartition of the system.
+    tau : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
+    red_func : string or list of strings, optional
+        Redundancy function, either 'mmi' or 'ccs'. For a list, the atoms of all
+        redundancy functions are computed from one shared set of local mutual
+        informations. The default is 'mmi'.
+
+    Returns
+    -------
+    atoms : dictionary where keys are 'rtr', ..., 'sts', and value is float
+        Average PhiID atoms.
+    local_atoms : float array
+        16-by-(T-tau) array of local PhiID atoms, rows ordered as ATOM_NAMES.
+
+    If red_func is a list, atoms and local_atoms are dictionaries with the
+    redundancy functions as keys and the above as values.
+
+    """
+
+    red_funcs = [red_func] if isinstance(red_func, str) else list(red_func)
+    if len(red_funcs) == 0 or not all(isinstance(r, str) and r.lower() in RED_FUNCS for r in red_funcs):
+        raise ValueError("unknown redundancy measure; implemented measures are 'mmi' and 'ccs'")
+
+    Z, groups = _stacked_data(X, tau)
+
+    # only the redundancy functions differ between red_funcs
+    mis = _local_mutual_infos(Z, groups)
+
+    atoms, local_atoms = {}, {}
+    for r in red_funcs:
+        local_atoms[r] = _local_atoms(mis, r.lower())
+
+        if not np.isfinite(local_atoms[r]).all():
+            warnings.warn('Outliers detected in PhiID computation. Results may be biased.')
+
+        atoms[r] = {name: float(_finite_mean(local)) for name, local in zip(ATOM_NAMES, local_atoms[r])}
+
+    if isinstance(red_func, str):
+        return atoms[red_func], local_atoms[red_func]
+    return atoms, local_atoms
+
+
+def phiid_average(S, red_func='mmi'):
+    """
+    Purpose : Compute average PhiID atoms in closed form from a lagged covariance.
+
+    For MMI, averaging local atoms is the same as solving the PhiID system for the
+    averaged quantities, and averaged Gaussian entropies only depend on
+    log-determinants of sub-blocks of the covariance. The cost is therefore O(D^3),
+    independent of the length of the time-series. CCS is defined through the signs
+    of local quantities and has no such closed form.
+
+    Parameters
+    ----------
+    S : float array
+        2D-by-2D covariance of [X_t; X_t+tau] of unit-variance variables, e.g.
+        lagged_covariance(standardize(X), tau).
+    red_func : string, optional
+        Redundancy function, only 'mmi' is supported. The default is 'mmi'.
+
+    Returns
+    -------
+    atoms : dictionary where keys are 'rtr', ..., 'sts', and value is float
+        Average PhiID atoms.
+
+    """
+
+    if red_func.lower() != 'mmi':
+        raise ValueError("closed-form PhiID atoms are only available for red_func 'mmi'")
+
+    S = np.asarray(S, dtype=float)
+    if S.ndim != 2 or S.shape[0] != S.shape[1] or S.shape[0] % 2 != 0:
+        raise ValueError('S is not a 2D-by-2D lagged covariance matrix')
+
+    order, groups = _mib_order(S)
+    S = S[np.ix_(order, order)]
+
+    return _average_atoms(lambda idx: entropy(S, idx), groups)
+
+
+def _average_atoms(entropy_of, groups):
+    # closed-form MMI atoms from the entropies of the unions of groups of variables
+    mis = _mutual_infos([None] + [np.atleast_1d(entropy_of(_subset_indices(groups, mask)))
+                                  for mask in range(1, 16)])
+    atoms = _local_atoms(mis, 'mmi')[:, 0]
+
+    return {name: float(atom) for name, atom in zip(ATOM_NAMES, atoms)}
+
+
+def phiid_average_from_stats(stats, tau=1, red_func='mmi'):
+    """
+    Purpose : Compute average PhiID atoms in closed form from the statistics of a dataset.
+
+    As phiid_average(stats.lagged_covariance(tau, unit_variance=True)), but the MIB
+    and the entropies of sub-blocks are taken from (and stored in) the caches of
+    stats, so they are shared with other measures and redundancy functions.
+
+    Parameters
+    ----------
+    stats : gaussian.GaussianStats
+        Statistics of the D-by-T micro time-series.
+    tau : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
+    red_func : string, optional
+        Redundancy function, only 'mmi' is supported. The default is 'mmi'.
+
+    Returns
+    -------
+    atoms : dictionary where keys are 'rtr', ..., 'sts', and value is float
+        Average PhiID atoms.
+
+    """
+
+    if red_func.lower() != 'mmi':
+        raise ValueError("closed-form PhiID atoms are only available for red_func 'mmi'")
+
+    order, groups = _mib_order(stats.lagged_covariance(tau, unit_variance=True),
+                               bipartition=stats.minimum_information_bipartition(tau))
+
+    return _average_atoms(lambda idx: stats.entropy(tau, [order[i] for i in idx]), groups)
+
+
+def phiid_local_atoms(X, tau=1, red_func='mmi', atoms=None, dtype=np.float64, out=None,
+                      chunk_size=65536):
+    """
+    Purpose : Compute local (per-sample) PhiID atoms with bounded memory.
+
+    The samples are processed in chunks, under the distribution (mean, covariance)
+    of the full data, and the atoms are written straight into the output, which can
+    be a memory-mapped .npy file. MMI compares mutual informations on average; the
+    averages of local Gaussian mutual informations equal the mutual informations of
+    the covariance (see phiid_average()), so a single pass is enough. The result
+    equals the local atoms of phiid_full(), restricted to atoms and cast to dtype.
+
+    Parameters
+    ----------
+    X : float array
+        D-by-T data matrix of D dimensions for T time-steps.
+    tau : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
+    red_func : string, optional
+        Redundancy function, either 'mmi' or 'ccs'. The default is 'mmi'.
+    atoms : list of strings, optional
+        Atoms to compute (see ATOM_NAMES), in the order of the output rows. The
+        default is None (all 16 atoms).
+    dtype : data type, optional
+        Data type of the output, e.g. np.float32. The default is np.float64.
+    out : string or float array, optional
+        Path of a .npy file to create as a memory-mapped array, or an array of shape
+        (len(atoms), T-tau) and data type dtype to write into. The default is None 
+        (new in-memory array).
+    chunk_size : integer, optional
+        Number of samples per chunk. The default is 65536.
+
+    Returns
+    -------
+    local_atoms : float array (np.memmap if out is a path)
+        len(atoms)-by-(T-tau) array of local PhiID atoms.
+
+    """
+
+    if not isinstance(red_func, str) or red_func.lower() not in RED_FUNCS:
+        raise ValueError("unknown redundancy measure; implemented measures are 'mmi' and 'ccs'")
+    names = ATOM_NAMES if atoms is None else list(atoms)
+    if len(names) == 0 or not all(name in ATOM_NAMES for name in names):
+        raise ValueError(f'atoms must be a non-empty list of atoms in {ATOM_NAMES}')
+    if chunk_size < 1:
+        raise ValueError('chunk_size is below one')
+
+    Z, groups = _stacked_data(X, tau)
+    mu, S = Z.mean(axis=1), np.cov(Z)
+    n = Z.shape[1]
+
+    mean = None
+    if red_func.lower() == 'mmi':
+        mis = _mutual_infos([None] + [entropy(S, _subset_indices(groups, mask)) for mask in range(1, 16)])
+        mean = lambda key, mask_key=None: mis[key]
+
+    local_atoms = _local_atoms_output(out, (len(names), n), dtype)
+
+    rows = [ATOM_NAMES.index(name) for name in names]
+    finite = True
+    for start in range(0, n, chunk_size):
+        chunk = slice(start, min(start + chunk_size, n))
+        chunk_atoms = _local_atoms(_local_mutual_infos(Z[:, chunk], groups, mu, S), red_func.lower(),
+                                   mean=mean, rows=rows)
+        finite = finite and np.isfinite(chunk_atoms).all()
+        local_atoms[:, chunk] = chunk_atoms
+
+    _finish_local_atoms(local_atoms, finite)
+    return local_atoms
+
+
+def _local_atoms_output(out, shape, dtype):
+    # array for the local atoms: new, a memory-mapped .npy file at path out, or out itself
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, np.ndarray):
+        if out.shape != shape or out.dtype != np.dtype(dtype):
+            raise ValueError(f'out has shape {out.shape} and dtype {out.dtype} instead of '
+                             f'{shape} and {np.dtype(dtype)}')
+        return out
+    return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+
+
+def _finish_local_atoms(local_atoms, finite):
+    # warn about non-finite local atoms, and write memory-mapped atoms to disk
+    if not finite:
+        warnings.warn('Outliers detected in PhiID computation. Results may be biased.')
+    if isinstance(local_atoms, np.memmap):
+        local_atoms.flush()
@@ -0,0 +1,251 @@
+"""
+Native (NumPy) implementation of the discrete Integrated Information Decomposition.
+
+This is a port of src/phiid/PhiIDFullDiscrete.m (with the plug-in estimators of
+DoubleRedundancyMMIDiscrete.m and DoubleRedundancyCCSDiscrete.m) which runs
+in-process, without a MATLAB engine or JIDT. Real-valued data is mean-binarised
+first; information is measured in bits, as in JIDT.
+
+The joint states of [X1; X2; Y1; Y2] are packed into one integer code per sample,
+so the joint histogram comes from a single np.bincount, and the histograms of all
+15 subsets of {X1, X2, Y1, Y2} are its marginals.
+
+Functions:
+  binarize - mean-binarise real-valued data, keep discrete data
+  discrete_mib - minimum information bipartition of a discrete system
+  phiid_full_discrete - average (and local) PhiID atoms of discrete data
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+from .phiid import ATOM_NAMES, RED_FUNCS, _mutual_infos, _local_atoms
+
+# largest number of joint states for which the joint histogram is held as a dense array
+_MAX_DENSE_STATES = 2 ** 22
+
+
+def binarize(X):
+    """
+    Purpose : Mean-binarise each row of a data matrix, unless the data is discrete already.
+
+    Mirrors isdiscrete.m: integer and boolean arrays, and float arrays whose values are
+    all (close to) integers, are returned as integers; any other array as
+    X > mean(X, 2).
+
+    Parameters
+    ----------
+    X : array
+        D-by-T data matrix.
+
+    Returns
+    -------
+    bX : integer array
+        D-by-T matrix of discrete states.
+
+    """
+
+    X = np.asarray(X)
+    if X.dtype.kind in 'biu':
+        return X.astype(np.int64)
+    if np.sum(np.abs(X - np.round(X))) < 1e-10:
+        return np.round(X).astype(np.int64)
+    return (X > X.mean(axis=1, keepdims=True)).astype(np.int64)
+
+
+def _codes(X):
+    """
+    Purpose : Code the joint state of the rows of X as one integer per sample.
+
+    Returns
+    -------
+    codes : integer array
+        Code of each of the T samples, between 0 and n_states-1.
+    n_states : integer
+        Number of distinct joint states.
+
+    """
+
+    codes = np.zeros(X.shape[1], dtype=np.int64)
+    n_states = 1
+    for row in X:
+        _, row = np.unique(row, return_inverse=True)
+        # compress to the observed states (at most T) so that the codes cannot overflow
+        _, codes = np.unique(codes * (row.max() + 1) + row, return_inverse=True)
+        n_states = int(codes.max()) + 1
+    return codes.ravel(), n_states
+
+
+def _entropy(codes):
+    # plug-in entropy (in bits) of a coded variable
+    p = np.bincount(codes) / len(codes)
+    p = p[p > 0]
+    return float(-np.sum(p * np.log2(p)))
+
+
+def _check_tau(tau, T):
+    # as shannon.check_lags(), for the single time-lag of the discrete measures: a tau
+    # outside [1, T-1] would silently slice past/future samples of the wrong lengths
+    if tau < 1 or tau >= T or int(tau) != tau:
+        raise ValueError(f'time-lag {tau} is not an integer between 1 and T-1 (T = {T} time-steps)')
+
+
+def discrete_mib(X, tau=1):
+    """
+    Purpose : Find the minimum information bipartition (MIB) of a discrete system.
+
+    As gaussian.minimum_information_bipartition(), with plug-in entropies: for every
+    bipartition the effective information I(X_t; X_t+tau) - sum_k I(M^k_t; M^k_t+tau)
+    is normalised by the smallest entropy of the parts, and the bipartition with the
+    lowest normalised value is returned.
+
+    Parameters
+    ----------
+    X : integer array
+        D-by-T matrix of discrete states, e.g. from binarize().
+    tau : integer, optional
+        Time-lag between past and future samples. The default is 1.
+
+    Returns
+    -------
+    p1, p2 : lists of integers
+        Indices of the two parts; p1 always contains variable 0.
+
+    """
+
+    D = X.shape[0]
+    if D < 2:
+        raise ValueError('the MIB is not defined for systems with less than two variables')
+    _check_tau(tau, X.shape[1])
+
+    past, future = X[:, :-tau], X[:, tau:]
+
+    def mutual_info(part):
+        past_codes, _ = _codes(past[part])
+        future_codes, n_future = _codes(future[part])
+        return (_entropy(past_codes) + _entropy(future_codes)
+                - _entropy(past_codes * n_future + future_codes))
+
+    variables = list(range(D))
+    system_mi = mutual_info(variables)
+
+    best_score = np.inf
+    best_partition = ([0], variables[1:])
+    for size in range(1, D // 2 + 1):
+        for part in combinations(range(D), size):
+            p1 = list(part)
+            p2 = [i for i in variables if i not in part]
+            # every bipartition is visited once: for even splits skip the mirror image
+            if 2 * size == D and 0 not in p1:
+                continue
+
+            norm = min(_entropy(_codes(past[p1])[0]), _entropy(_codes(past[p2])[0]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = np.float64(system_mi - mutual_info(p1) - mutual_info(p2)) / norm
+            if score < best_score:
+                best_score = score
+                best_partition = (p1, p2)
+
+    p1, p2 = best_partition
+    return (p1, p2) if 0 in p1 else (p2, p1)
+
+
+def _local_entropies(codes, n_states):
+    """
+    Purpose : Local entropies -log2 p of every non-empty subset of {X1, X2, Y1, Y2}.
+
+    Parameters
+    ----------
+    codes : list of 4 integer arrays
+        State codes of X1, X2, Y1 and Y2 of each sample.
+    n_states : list of 4 integers
+        Number of states of X1, X2, Y1 and Y2.
+
+    Returns
+    -------
+    h : list
+        Local entropy of each sample, indexed by bitmask (bit 0: X1, bit 1: X2,
+        bit 2: Y1, bit 3: Y2); h[0] is None.
+
+    """
+
+    T = len(codes[0])
+    h = [None]
+
+    if np.prod(n_states, dtype=float) <= _MAX_DENSE_STATES:
+        # one histogram of the packed joint states; axes are (Y2, Y1, X2, X1)
+        packed = codes[0] + n_states[0] * (codes[1] + n_states[1] * (codes[2] + n_states[2] * codes[3]))
+        joint = np.bincount(packed, minlength=int(np.prod(n_states))).reshape(n_states[::-1])
+        for mask in range(1, 16):
+            in_mask = [bool(mask & (1 << g)) for g in range(4)]
+            marginal = joint.sum(axis=tuple(3 - g for g in range(4) if not in_mask[g]), keepdims=True)
+            counts = marginal[tuple(codes[g] if in_mask[g] else 0 for g in reversed(range(4)))]
+            h.append(-np.log2(counts / T))
+    else:
+        # too many joint states for a dense histogram: count the observed states of each subset
+        for mask in range(1, 16):
+            subset_codes = np.zeros(T, dtype=np.int64)
+            for g in range(4):
+                if mask & (1 << g):
+                    _, subset_codes = np.unique(subset_codes * n_states[g] + codes[g], return_inverse=True)
+            counts = np.bincount(subset_codes.ravel())[subset_codes.ravel()]
+            h.append(-np.log2(counts / T))
+
+    return h
+
+
+def phiid_full_discrete(X, tau=1, red_func='mmi'):
+    """
+    Purpose : Compute the full PhiID decomposition of discrete data.
+
+    Parameters
+    ----------
+    X : array
+        D-by-T data matrix of D dimensions for T time-steps. Real-valued data is
+        mean-binarised (see binarize()). If D > 2, PhiID is computed across the
+        minimum information bipartition of the system (see discrete_mib()).
+    tau : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
+    red_func : string or list of strings, optional
+        Redundancy function, either 'mmi' or 'ccs'. For a list, the atoms of all
+        redundancy functions are computed from one shared set of local mutual
+        informations. The default is 'mmi'.
+
+    Returns
+    -------
+    atoms : dictionary where keys are 'rtr', ..., 'sts', and value is float
+        Average PhiID atoms (in bits).
+    local_atoms : float array
+        16-by-(T-tau) array of local PhiID atoms, rows ordered as ATOM_NAMES.
+
+    If red_func is a list, atoms and local_atoms are dictionaries with the
+    redundancy functions as keys and the above as values.
+
+    """
+
+    red_funcs = [red_func] if isinstance(red_func, str) else list(red_func)
+    if len(red_funcs) == 0 or not all(isinstance(r, str) and r.lower() in RED_FUNCS for r in red_funcs):
+        raise ValueError("unknown redundancy measure; implemented measures are 'mmi' and 'ccs'")
+
+    X = binarize(X)
+    D, T = X.shape
+    if T <= D:
+        raise ValueError(f'data has {D} dimensions and {T} time-steps; '
+                         f'you may have forgotten to transpose the matrix')
+    _check_tau(tau, T)
+
+    p1, p2 = discrete_mib(X, tau) if D > 2 else ([0], [1])
+    coded = [_codes(block) for block in [X[p1, :-tau], X[p2, :-tau], X[p1, tau:], X[p2, tau:]]]
+
+    # only the redundancy functions differ between red_funcs
+    mis = _mutual_infos(_local_entropies([codes for codes, _ in coded], [n for _, n in coded]))
+
+    atoms, local_atoms = {}, {}
+    for r in red_funcs:
+        local_atoms[r] = _local_atoms(mis, r.lower())
+        atoms[r] = {name: float(np.mean(local)) for name, local in zip(ATOM_NAMES, local_atoms[r])}
+
+    if isinstance(red_func, str):
+        return atoms[red_func], local_atoms[red_func]
+    return atoms, local_atoms
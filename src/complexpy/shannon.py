@@ -0,0 +1,250 @@
+"""
+Native (NumPy) implementation of the Gaussian Shannon-based emergence criteria.
+
+This is a port of src/shannon_wpe/EmergencePsi.m, EmergenceDelta.m and
+EmergenceGamma.m (with GaussianMI.m) which reads all three criteria from one
+lagged correlation matrix instead of one correlation per pair of variables.
+
+Functions:
+  lagged_correlation - correlation between [micro, macro] at t and at t+tau
+  lagged_correlations - lagged correlation matrices for many lags in one FFT pass
+  check_lags - check time-lags against the length of the time-series
+  emergence_from_correlation - Psi, Delta and Gamma from a lagged correlation matrix
+  emergence_from_covariance - Psi, Delta and Gamma from the lagged covariance of the micro variables
+  shannon_emergence - Psi, Delta and Gamma of micro and macro time-series
+  shannon_emergence_lags - Psi, Delta and Gamma for many time-lags at once
+  shannon_emergence_windows - Psi, Delta and Gamma in each of a series of sliding windows
+"""
+
+import numpy as np
+from scipy.fft import rfft, irfft, next_fast_len
+
+from .gaussian import correlation, sliding_lagged_covariance
+
+
+def lagged_correlation(Z, tau=1):
+    """
+    Purpose : Pearson correlation between all variables at t and all variables at t+tau.
+
+    Parameters
+    ----------
+    Z : float array
+        T-by-N data matrix (samples are rows).
+    tau : integer, optional
+        Time-lag, between 1 and T-2. The default is 1.
+
+    Returns
+    -------
+    R : float array
+        N-by-N matrix where R[i, j] = corr(Z[t, i], Z[t+tau, j]).
+
+    """
+
+    check_lags([tau], Z.shape[0])
+    past = Z[:-tau] - Z[:-tau].mean(axis=0)
+    future = Z[tau:] - Z[tau:].mean(axis=0)
+    norm = np.sqrt(np.outer(np.sum(past * past, axis=0), np.sum(future * future, axis=0)))
+    return (past.T @ future) / norm
+
+
+def lagged_correlations(Z, taus):
+    """
+    Purpose : Lagged correlation matrices of a data matrix for several time-lags at once.
+
+    All lagged cross-products sum_t Z[t, i] * Z[t+tau, j] are obtained from a single
+    zero-padded FFT cross-correlation, and the means and variances of the truncated
+    segments from cumulative sums, so the cost is O(N^2 T log T) instead of
+    O(N^2 T) per lag.
+
+    Parameters
+    ----------
+    Z : float array
+        T-by-N data matrix (samples are rows).
+    taus : list of integers
+        Time-lags, each between 1 and T-2.
+
+    Returns
+    -------
+    R : float array
+        len(taus)-by-N-by-N array where R[k] equals lagged_correlation(Z, taus[k]).
+
+    """
+
+    T, N = Z.shape
+    check_lags(taus, T)
+    taus = np.asarray(taus, dtype=int)
+
+    # centre the data to avoid cancellation when removing the segment means below
+    Z = Z - Z.mean(axis=0)
+
+    # zero-pad to at least T + max(taus) so that the circular correlation does not wrap
+    nfft = next_fast_len(T + int(taus.max()))
+    F = rfft(Z, n=nfft, axis=0)
+    cross = np.empty((len(taus), N, N))
+    for i in range(N):
+        cross[:, i, :] = irfft(np.conj(F[:, i, None]) * F, n=nfft, axis=0)[taus]
+
+    # sums and sums of squares of Z[:-tau] (past) and Z[tau:] (future)
+    csum = np.vstack([np.zeros(N), np.cumsum(Z, axis=0)])
+    csum2 = np.vstack([np.zeros(N), np.cumsum(Z * Z, axis=0)])
+    n = (T - taus)[:, None]
+    sum_past, sum_future = csum[T - taus], csum[T] - csum[taus]
+    var_past = csum2[T - taus] - sum_past ** 2 / n
+    var_future = csum2[T] - csum2[taus] - sum_future ** 2 / n
+
+    cov = cross - sum_past[:, :, None] * sum_future[:, None, :] / n[:, :, None]
+    return cov / np.sqrt(var_past[:, :, None] * var_future[:, None, :])
+
+
+def check_lags(taus, T):
+    """
+    Purpose : Raise ValueError unless all time-lags leave at least two pairs (t, t+tau) of T samples.
+    """
+
+    for tau in taus:
+        if tau < 1 or tau >= T - 1:
+            raise ValueError(f'time-lag {tau} is not between 1 and T-2 (T = {T} time-steps)')
+
+
+def emergence_from_correlation(R):
+    """
+    Purpose : Compute Psi, Delta and Gamma from a lagged correlation matrix.
+
+    Parameters
+    ----------
+    R : float array
+        (D+1)-by-(D+1) lagged correlation matrix of [micro, macro], with the macro
+        variable last, e.g. from lagged_correlation().
+
+    Returns
+    -------
+    psi, delta, gamma : float
+        Causal emergence, downward causation and causal decoupling criteria.
+
+    """
+
+    psi, delta, gamma = _criteria(R)
+    return float(psi), float(delta), float(gamma)
+
+
+def _criteria(R):
+    # Psi, Delta and Gamma of one lagged correlation matrix or of a stack of them
+    mi = -0.5 * np.log(1 - R * R)
+    D = R.shape[-1] - 1
+
+    psi = mi[..., D, D] - np.sum(mi[..., :D, D], axis=-1)
+    delta = np.max(mi[..., D, :D] - np.sum(mi[..., :D, :D], axis=-2), axis=-1)
+    gamma = np.max(mi[..., D, :D], axis=-1)
+
+    return psi, delta, gamma
+
+
+def emergence_from_covariance(S, macro_weights):
+    """
+    Purpose : Compute Psi, Delta and Gamma from the lagged covariance of the micro variables.
+
+    Parameters
+    ----------
+    S : float array
+        2D-by-2D covariance of [micro_t; micro_t+tau].
+    macro_weights : float array
+        Weights w of the linear macro variable V = w * micro, of length D.
+
+    Returns
+    -------
+    psi, delta, gamma : float
+        Causal emergence, downward causation and causal decoupling criteria.
+
+    """
+
+    D = S.shape[0] // 2
+    W = np.vstack([np.eye(D), np.ravel(macro_weights)])
+    W = np.block([[W, np.zeros_like(W)], [np.zeros_like(W), W]])
+
+    # covariance of [micro_t; macro_t; micro_t+tau; macro_t+tau] and its past-future block
+    C = correlation(W @ S @ W.T)
+    return emergence_from_correlation(C[:D + 1, D + 1:])
+
+
+def shannon_emergence(micro, macro, tau=1):
+    """
+    Purpose : Compute Psi, Delta and Gamma of Gaussian micro and macro time-series.
+
+    Parameters
+    ----------
+    micro : float array
+        T-by-D time-series of micro variables.
+    macro : float array
+        Time-series of the macro variable, of length T.
+    tau : integer, optional
+        Time-lag of the time-delayed mutual information. The default is 1.
+
+    Returns
+    -------
+    psi, delta, gamma : float
+        Causal emergence, downward causation and causal decoupling criteria.
+
+    """
+
+    Z = np.column_stack([micro, np.ravel(macro)]).astype(float)
+    return emergence_from_correlation(lagged_correlation(Z, tau))
+
+
+def shannon_emergence_lags(micro, macro, taus):
+    """
+    Purpose : Compute Psi, Delta and Gamma for several time-lags in one pass.
+
+    Parameters
+    ----------
+    micro : float array
+        T-by-D time-series of micro variables.
+    macro : float array
+        Time-series of the macro variable, of length T.
+    taus : list of integers
+        Time-lags of the time-delayed mutual information.
+
+    Returns
+    -------
+    criteria : list of tuples
+        (psi, delta, gamma) for each time-lag in taus.
+
+    """
+
+    Z = np.column_stack([micro, np.ravel(macro)]).astype(float)
+    return [emergence_from_correlation(R) for R in lagged_correlations(Z, taus)]
+
+
+def shannon_emergence_windows(micro, macro, tau, window, stride=1):
+    """
+    Purpose : Compute Psi, Delta and Gamma in each of a series of sliding windows.
+
+    The lagged covariance of [micro, macro] is updated incrementally as the window
+    slides (see gaussian.sliding_lagged_covariance()), and the criteria of all
+    windows are computed at once.
+
+    Parameters
+    ----------
+    micro : float array
+        T-by-D time-series of micro variables.
+    macro : float array
+        Time-series of the macro variable, of length T.
+    tau : integer
+        Time-lag of the time-delayed mutual information.
+    window : integer
+        Number of time-steps per window.
+    stride : integer, optional
+        Number of time-steps between the starts of consecutive windows. The default
+        is 1.
+
+    Returns
+    -------
+    psi, delta, gamma : float arrays
+        Criteria of each window; entry k equals shannon_emergence() of the
+        time-steps k*stride to k*stride+window.
+
+    """
+
+    Z = np.column_stack([micro, np.ravel(macro)]).astype(float)
+    N = Z.shape[1]
+    R = correlation(sliding_lagged_covariance(Z.T, tau, window, stride))[:, :N, N:]
+    return _criteria(R)
@@ -0,0 +1,139 @@
+import os
+import pickle
+import numpy as np
+import complexpy as cp
+import complexpy.cache as cache
+import pytest as pt
+
+
+@pt.fixture
+def data_dict_test():
+    np.random.seed(1000)
+    data_dict = dict()
+    data_dict['micro'] = np.random.randn(10, 500)
+    data_dict['macro'] = data_dict['micro'].sum(axis=0)
+    return data_dict
+
+# ----------------------------------------------------------------------------------
+# CACHE_KEY()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that keys depend on array bytes and parameters, not on how they are passed
+# ----------------------------------------------------------------------------------
+def test_cache_key(data_dict_test):
+
+    key = cache.cache_key(cp.phiid_wpe, data_dict_test)
+
+    assert key == cache.cache_key(cp.phiid_wpe, {'macro': data_dict_test['macro'].copy(),
+                                                 'micro': data_dict_test['micro'].copy()})
+    assert key == cache.cache_key(cp.phiid_wpe, data_dict_test, time_lag_for_measure=1, red_func='mmi')
+    assert key != cache.cache_key(cp.phiid_wpe, data_dict_test, red_func='ccs')
+    assert key != cache.cache_key(cp.shannon_wpe, data_dict_test)
+
+    data_dict_test['micro'][3, 7] += 1e-12
+    assert key != cache.cache_key(cp.phiid_wpe, data_dict_test)
+
+# ----------------------------------------------------------------------------------
+# assert that keys change with the complexpy version and the cache format
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("attribute, value", [('__version__', '0.0.0'), ('_CACHE_FORMAT', 0)])
+def test_cache_key_version(data_dict_test, monkeypatch, attribute, value):
+
+    key = cache.cache_key(cp.phiid_wpe, data_dict_test)
+    monkeypatch.setattr(cache, attribute, value)
+    assert key != cache.cache_key(cp.phiid_wpe, data_dict_test)
+
+# ----------------------------------------------------------------------------------
+# RESULTCACHE & CACHEDMEASURE
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that cache hits return the stored result without recomputation
+# ----------------------------------------------------------------------------------
+def test_cached_measure(data_dict_test, tmp_path):
+
+    calls = []
+
+    def measure(data_dict, time_lag_for_measure=1):
+        calls.append(time_lag_for_measure)
+        return cp.shannon_wpe(data_dict, time_lag_for_measure=time_lag_for_measure, backend='numpy')
+
+    cached_measure = cache.ResultCache(tmp_path).wrap(measure)
+
+    result = cached_measure(data_dict_test, time_lag_for_measure=2)
+    assert cached_measure(data_dict_test, time_lag_for_measure=2) == result
+    assert cached_measure(data_dict_test, 2) == result
+    assert calls == [2]
+
+    # a new cache object on the same directory sees the stored entries
+    cached_measure = cache.ResultCache(tmp_path).wrap(measure)
+    assert cached_measure(data_dict_test, time_lag_for_measure=2) == result
+    cached_measure(data_dict_test, time_lag_for_measure=3)
+    assert calls == [2, 3]
+
+    # a new version of the measure is recomputed
+    cached_measure = cache.ResultCache(tmp_path).wrap(measure, version=2)
+    assert cached_measure(data_dict_test, time_lag_for_measure=2) == result
+    assert calls == [2, 3, 2]
+    assert cached_measure.__getstate__()['version'] == 2
+
+# ----------------------------------------------------------------------------------
+# assert that overwritten .npy files are recomputed, and iterators of chunks not cached
+# ----------------------------------------------------------------------------------
+def test_cached_measure_chunked(data_dict_test, tmp_path):
+
+    path = tmp_path / 'micro.npy'
+    cached_measure = cache.ResultCache(tmp_path / 'cache').wrap(cp.phiid_wpe)
+
+    np.save(path, data_dict_test['micro'][:4])
+    result = cached_measure({'micro': str(path)}, backend='numpy')
+    assert cached_measure({'micro': str(path)}, backend='numpy') == result
+    assert cache.cache_key(cp.phiid_wpe, {'micro': path}) == cache.cache_key(cp.phiid_wpe, {'micro': path})
+
+    key = cache.cache_key(cp.phiid_wpe, {'micro': path})
+    np.save(path, data_dict_test['micro'][4:8])
+    os.utime(path, ns=(0, 0))
+    assert cache.cache_key(cp.phiid_wpe, {'micro': path}) != key
+    assert cached_measure({'micro': str(path)}, backend='numpy') != result
+
+    n_entries = len(cached_measure.cache)
+    chunks = (data_dict_test['micro'][4:8, start:start + 100] for start in range(0, 500, 100))
+    expected = cp.phiid_wpe({'micro': data_dict_test['micro'][4:8]}, backend='numpy')
+    result = cached_measure({'micro': chunks}, backend='numpy')
+    for key in expected:
+        assert result[key] == pt.approx(expected[key], abs=1e-12)
+    assert len(cached_measure.cache) == n_entries
+
+# ----------------------------------------------------------------------------------
+# assert that the least recently used entries are evicted beyond the size limit
+# ----------------------------------------------------------------------------------
+def test_result_cache_eviction(tmp_path):
+
+    entry_size = len(pickle.dumps(np.zeros(100), protocol=-1))
+    result_cache = cache.ResultCache(tmp_path, max_bytes=3 * entry_size)
+
+    for i, key in enumerate(['a', 'b', 'c']):
+        result_cache.put(key, np.zeros(100))
+        os.utime(tmp_path / (key + '.pkl'), ns=(i * 10**9, i * 10**9))
+
+    # using 'a' makes 'b' the least recently used entry
+    assert result_cache.get('a') is not None
+    result_cache.put('d', np.zeros(100))
+
+    assert len(result_cache) == 3
+    assert 'b' not in result_cache
+    assert all(key in result_cache for key in ['a', 'c', 'd'])
+
+    # overwriting entries does not count their old size
+    for _ in range(5):
+        result_cache.put('a', np.zeros(100))
+    assert result_cache._size == 3 * entry_size
+    assert all(key in result_cache for key in ['a', 'c', 'd'])
+
+    result_cache.clear()
+    assert len(result_cache) == 0
+    assert result_cache.get('a', 'missing') == 'missing'
+
+    with pt.raises(ValueError):
+        cache.ResultCache(tmp_path, max_bytes=0)
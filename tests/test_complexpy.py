@@ -1,9 +1,12 @@
 from __future__ import absolute_import, division, print_function
+import functools
+import os
 import os.path as op
 import numpy as np
 import pandas as pd
 import numpy.testing as npt
 import complexpy as cp
+import complexpy.data_simulation as ds
 import pytest as pt
 
 
@@ -18,6 +21,21 @@ def data_dict_test():
     data_dict['macro'] = data_dict['micro'].sum(axis=0)
     return data_dict
 
+@pt.fixture
+def mvar_sweep_test():
+    # sweep of 2-node MVAR models (3 couplings x 2 noise correlations) with the native
+    # shannon_wpe at two time-lags; returned in the argument order of compute_emergence()
+    model_functions = {'mvar': ds.generate_2node_mvar_data}
+    model_variables = {'mvar': ['coupling', 'npoints', 'time_lag_for_model', 'noise_corr',
+                                'macro_func_mvar', 'micro_func_mvar', 'backend']}
+    emergence_functions = {'shannon_wpe': functools.partial(cp.shannon_wpe, backend='numpy')}
+    measure_variables = {'shannon_wpe': ['time_lag_for_measure']}
+    parameters = {'coupling': [0.1, 0.3, 0.45], 'npoints': [2000], 'time_lag_for_model': [1],
+                  'noise_corr': [0.0, 0.5], 'macro_func_mvar': [ds.sum_micro_mvar],
+                  'micro_func_mvar': [ds.raw_micro_mvar], 'backend': ['numpy'],
+                  'time_lag_for_measure': [1, 3]}
+    return model_functions, model_variables, emergence_functions, measure_variables, parameters
+
 # ----------------------------------------------------------------------------------
 # SHANNON_WPE()
 # ----------------------------------------------------------------------------------
@@ -281,3 +299,298 @@ def test_get_result_for_measure_output(data_dict_test, measure_name, measure_fun
     assert isinstance(result_df.loc[:,'measure'], str)
 
 
+
+# ----------------------------------------------------------------------------------
+# assert that results are stored in one row per output with categorical columns
+# ----------------------------------------------------------------------------------
+def test_get_result_for_measure_columns(data_dict_test):
+
+    measure_func = functools.partial(cp.phiid_wpe, backend='numpy')
+    result_df = cp.get_result_for_measure('phiid_wpe', measure_func,
+                                          {'time_lag_for_measure': [1, 2], 'red_func': ['mmi', 'ccs']},
+                                          data_dict_test)
+
+    assert list(result_df.columns) == ['value', 'measure', 'time_lag_for_measure', 'red_func']
+    assert len(result_df) == 2 * 2 * 3
+    assert result_df['value'].dtype == np.float64
+    assert isinstance(result_df['measure'].dtype, pd.CategoricalDtype)
+    assert isinstance(result_df['red_func'].dtype, pd.CategoricalDtype)
+    assert list(result_df['measure'][:3]) == ['phiid_wpe', 'phiid_dc', 'phiid_cd']
+    assert result_df['value'][0] == pt.approx(measure_func(data_dict_test)['phiid_wpe'])
+
+# ----------------------------------------------------------------------------------
+# GAUSSIANSTATS
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that measures give the same results from shared statistics, which are
+# computed once per time-lag, and that the statistics do not change cache keys
+# ----------------------------------------------------------------------------------
+def test_gaussian_stats(data_dict_test):
+
+    micro = data_dict_test['micro'][:4]
+    data_dict = {'micro': micro, 'macro': micro.sum(axis=0)}
+    stats = cp.GaussianStats(data_dict['micro'], data_dict['macro'])
+    stats_dict = dict(data_dict, gaussian_stats=stats)
+
+    for time_lag in [1, 3]:
+        expected = cp.phiid_wpe(data_dict, time_lag_for_measure=time_lag, backend='numpy')
+        result_dict = cp.phiid_wpe(stats_dict, time_lag_for_measure=time_lag, backend='numpy')
+        for key in expected:
+            assert result_dict[key] == pt.approx(expected[key], abs=1e-12)
+
+        expected = cp.shannon_wpe(data_dict, time_lag_for_measure=time_lag, backend='numpy')
+        result_dict = cp.shannon_wpe(stats_dict, time_lag_for_measure=time_lag, backend='numpy')
+        for key in expected:
+            assert result_dict[key] == pt.approx(expected[key], abs=1e-12)
+
+    assert sorted(stats._covariances) == [1, 3] and sorted(stats._bipartitions) == [1, 3]
+    n_entropies = len(stats._entropies)
+    cp.phiid_wpe(stats_dict, time_lag_for_measure=3, red_func=['mmi', 'MMI'], average_only=True)
+    assert len(stats._entropies) == n_entropies
+
+    # the data is stacked once, and sub-block entropies slice one stored matrix per time-lag
+    stacked = stats._data
+    stats.entropy(3, [0, 5, 2])
+    assert stats._data is stacked
+    assert stats.lagged_covariance(3, unit_variance=True) is stats.lagged_covariance(3, unit_variance=True)
+
+    assert cp.cache_key(cp.phiid_wpe, stats_dict) == \
+        cp.cache_key(cp.phiid_wpe, dict(data_dict, gaussian_stats=cp.GaussianStats(micro)))
+
+    # a macro variable is one time-series
+    cp.GaussianStats(micro, data_dict['macro'][None, :])
+    for macro in [np.vstack([data_dict['macro']] * 2), data_dict['macro'][:-1]]:
+        with pt.raises(ValueError):
+            cp.GaussianStats(micro, macro)
+
+# ----------------------------------------------------------------------------------
+# COMPUTE_EMERGENCE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that a parallel sweep gives the same dataframe as a serial sweep
+# ----------------------------------------------------------------------------------
+def test_compute_emergence_parallel(mvar_sweep_test):
+
+    model_functions, model_variables, emergence_functions, measure_variables, parameters = \
+        mvar_sweep_test
+
+    serial_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                     measure_variables, parameters)
+    parallel_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                       measure_variables, parameters, n_jobs=2)
+
+    assert len(serial_df) == 3 * 2 * 2 * 3
+    pd.testing.assert_frame_equal(serial_df, parallel_df)
+
+    with pt.raises(ValueError):
+        cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                             measure_variables, parameters, n_jobs=0)
+
+# ----------------------------------------------------------------------------------
+# assert that a checkpointed sweep resumes with the missing model instantiations only
+# ----------------------------------------------------------------------------------
+def test_compute_emergence_checkpoints(mvar_sweep_test, tmp_path):
+
+    model_functions, model_variables, emergence_functions, measure_variables, parameters = \
+        mvar_sweep_test
+
+    expected_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                       dict(measure_variables), parameters)
+    result_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                     dict(measure_variables), parameters, results_dir=tmp_path)
+    pd.testing.assert_frame_equal(expected_df, result_df)
+
+    checkpoints = sorted(tmp_path.iterdir())
+    assert len(checkpoints) == 3 * 2
+
+    # simulate an interrupted sweep: completed checkpoints are not recomputed
+    os.remove(checkpoints[0])
+    mtimes = {path: path.stat().st_mtime_ns for path in checkpoints[1:]}
+    result_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                     dict(measure_variables), parameters, results_dir=tmp_path)
+    pd.testing.assert_frame_equal(expected_df, result_df)
+    assert checkpoints[0].exists()
+    assert all(path.stat().st_mtime_ns == mtime for path, mtime in mtimes.items())
+
+    # a new measure parameter value gives new checkpoints
+    parameters['time_lag_for_measure'] = [1, 2]
+    cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                         dict(measure_variables), parameters, results_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2 * 3 * 2
+
+    # so does a new version of the model and measure functions
+    cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                         dict(measure_variables), parameters, results_dir=tmp_path, version='2')
+    assert len(list(tmp_path.iterdir())) == 3 * 3 * 2
+
+# ----------------------------------------------------------------------------------
+# PLAN_EMERGENCE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that identical cells are simulated once, and the plan is reported up front
+# ----------------------------------------------------------------------------------
+def test_plan_emergence(data_dict_test):
+
+    calls = []
+
+    def model(coupling, npoints, micro_func):
+        calls.append(coupling)
+        return data_dict_test
+
+    model_functions = {'model': model}
+    model_variables = {'model': ['coupling', 'npoints', 'micro_func']}
+    emergence_functions = {'shannon_wpe': functools.partial(cp.shannon_wpe, backend='numpy'),
+                           'phiid_wpe': functools.partial(cp.phiid_wpe, backend='numpy')}
+    measure_variables = {'shannon_wpe': ['time_lag_for_measure', 'micro', 'macro'],
+                         'phiid_wpe': ['time_lag_for_measure', 'red_func', 'micro']}
+    parameters = {'coupling': [0.1, 0.2, 0.1], 'npoints': [500], 'micro_func': [np.copy],
+                  'time_lag_for_measure': [1, 2], 'red_func': ['mmi', 'ccs']}
+
+    plan = cp.plan_emergence(model_functions, model_variables, emergence_functions,
+                             measure_variables, parameters)
+
+    assert plan.n_cells == 3
+    assert len(plan.tasks) == 2
+    assert plan.cell_tasks == [0, 1, 0]
+    # both red_funcs of phiid_wpe are computed in one call
+    assert plan.n_measure_calls == 2 * (2 + 2)
+    assert plan.cost == 2 * 500 * (1 + 2 + 2)
+    assert calls == []
+
+    result_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                     measure_variables, parameters)
+    assert calls == [0.1, 0.2]
+    assert len(result_df) == 3 * (2 * 3 + 2 * 2 * 3)
+    assert list(result_df['coupling'].unique()) == [0.1, 0.2]
+    assert measure_variables['shannon_wpe'] == ['time_lag_for_measure', 'micro', 'macro']
+
+    with pt.raises(ValueError):
+        cp.plan_emergence(model_functions, model_variables, emergence_functions,
+                          {'shannon_wpe': 'time_lag_for_measure'}, parameters)
+
+# ----------------------------------------------------------------------------------
+# assert that 2-node MVAR model instantiations are simulated together, with the results
+# of one simulation each
+# ----------------------------------------------------------------------------------
+def test_plan_emergence_batched_simulation(mvar_sweep_test, monkeypatch):
+
+    model_functions, model_variables, emergence_functions, measure_variables, parameters = \
+        mvar_sweep_test
+
+    def unbatched_model(**kwargs):
+        return ds.generate_2node_mvar_data(**kwargs)
+
+    plan = cp.plan_emergence(model_functions, model_variables, emergence_functions,
+                             measure_variables, parameters)
+    assert plan.batches == [[0, 1, 2, 3, 4, 5]]
+    assert cp.plan_emergence({'mvar': unbatched_model}, model_variables, emergence_functions,
+                             measure_variables, parameters).batches == [[i] for i in range(6)]
+
+    expected_df = cp.compute_emergence({'mvar': unbatched_model}, model_variables, emergence_functions,
+                                       measure_variables, parameters)
+    result_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                     measure_variables, parameters)
+    pd.testing.assert_frame_equal(expected_df, result_df)
+
+    # batches are limited in size, and split by npoints
+    monkeypatch.setattr(cp.complexpy, '_max_batch_values', 4 * (2000 + 500))
+    parameters['npoints'] = [2000, 1000]
+    plan = cp.plan_emergence(model_functions, model_variables, emergence_functions,
+                             measure_variables, parameters)
+    assert sorted(len(batch) for batch in plan.batches) == [2, 2, 2, 3, 3]
+
+# ----------------------------------------------------------------------------------
+# assert that batching red_func keeps the rows and columns of the unbatched sweep, 
+# wherever red_func is among the measure variables
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("measure_variables", [['red_func', 'time_lag_for_measure'],
+                                           ['time_lag_for_measure', 'red_func']])
+def test_compute_emergence_batched_order(data_dict_test, measure_variables):
+
+    def model(coupling, npoints):
+        return data_dict_test
+
+    def unbatched_phiid_wpe(data_dict, **kwargs):
+        return cp.phiid_wpe(data_dict, backend='numpy', **kwargs)
+
+    parameters = {'coupling': [0.1], 'npoints': [500], 'time_lag_for_measure': [1, 2], 
+                  'red_func': ['mmi', 'ccs']}
+    result_dfs = [cp.compute_emergence({'model': model}, {'model': ['coupling', 'npoints']},
+                                       {'phiid_wpe': measure_func}, {'phiid_wpe': measure_variables},
+                                       parameters)
+                  for measure_func in [functools.partial(cp.phiid_wpe, backend='numpy'), unbatched_phiid_wpe]]
+
+    assert cp.plan_emergence({'model': model}, {'model': ['coupling', 'npoints']},
+                             {'phiid_wpe': functools.partial(cp.phiid_wpe, backend='numpy')},
+                             {'phiid_wpe': measure_variables}, parameters).n_measure_calls == 2
+    pd.testing.assert_frame_equal(result_dfs[0], result_dfs[1])
+
+# ----------------------------------------------------------------------------------
+# assert that the shared Gaussian statistics are only passed to measures that read them
+# ----------------------------------------------------------------------------------
+def test_compute_emergence_gaussian_stats(data_dict_test):
+
+    keys = {}
+
+    def model(coupling):
+        return dict(data_dict_test)
+
+    def record_keys(name, measure_func):
+        def measure(data_dict, **kwargs):
+            keys[name] = sorted(data_dict)
+            return measure_func(data_dict, **kwargs)
+        return measure
+
+    emergence_functions = {'user': record_keys('user', lambda data_dict: {'value': 0.0}),
+                           'discrete': functools.partial(cp.phiid_wpe, backend='numpy', discrete=True),
+                           'shannon_wpe': functools.partial(cp.shannon_wpe, backend='numpy')}
+    cp.compute_emergence({'model': model}, {'model': ['coupling']}, emergence_functions,
+                         {'user': [], 'discrete': ['time_lag_for_measure'], 
+                          'shannon_wpe': ['time_lag_for_measure']},
+                         {'coupling': [0.1], 'time_lag_for_measure': [1]})
+    assert keys['user'] == ['macro', 'micro']
+
+    assert not cp.complexpy._uses_gaussian_stats(emergence_functions['discrete'], {})
+    assert not cp.complexpy._uses_gaussian_stats(cp.phiid_wpe, {})
+    assert cp.complexpy._uses_gaussian_stats(cp.phiid_wpe, {'backend': ['matlab', 'numpy']})
+    assert cp.complexpy._uses_gaussian_stats(functools.partial(emergence_functions['shannon_wpe']), {})
+
+# ----------------------------------------------------------------------------------
+# ITER_EMERGENCE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the streamed results add up to compute_emergence(), and can be stopped early
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("n_jobs", [1, 2])
+def test_iter_emergence(mvar_sweep_test, n_jobs):
+
+    model_functions, model_variables, emergence_functions, measure_variables, parameters = \
+        mvar_sweep_test
+
+    expected_df = cp.compute_emergence(model_functions, model_variables, emergence_functions,
+                                       measure_variables, parameters)
+
+    result_dfs = list(cp.iter_emergence(model_functions, model_variables, emergence_functions,
+                                        measure_variables, parameters, n_jobs=n_jobs))
+    assert len(result_dfs) == 3 * 2
+    assert all(len(result_df) == 2 * 3 for result_df in result_dfs)
+    result_df = pd.concat(result_dfs, ignore_index=True)
+    pd.testing.assert_frame_equal(expected_df, result_df, check_categorical=False)
+
+    # stop at the first model instantiation with strong causal decoupling
+    n_results = 0
+    for result_df in cp.iter_emergence(model_functions, model_variables, emergence_functions,
+                                       measure_variables, parameters, n_jobs=n_jobs):
+        n_results += 1
+        if (result_df.loc[result_df['measure'] == 'shannon_cd', 'value'] > 0.5).any():
+            break
+    assert n_results == 5
+    assert result_df['coupling'][0] == 0.45
+
+    with pt.raises(ValueError):
+        cp.iter_emergence(model_functions, model_variables, emergence_functions,
+                          measure_variables, parameters, n_jobs=0)
@@ -0,0 +1,156 @@
+import numpy as np
+import complexpy.data_simulation as ds
+import pytest as pt
+from scipy.linalg import solve_discrete_lyapunov
+
+
+# ----------------------------------------------------------------------------------
+# SIM_MVAR_NETWORK()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the simulated data has the stationary covariance of the model
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_model, noise_corr", [(1, 0.0), (1, 0.5), (3, 0.3)])
+def test_sim_mvar_network_covariance(time_lag_for_model, noise_corr):
+
+    coupling_matrix = np.array([[0.3, 0.3], [0.3, 0.3]])
+    sim_data = ds.sim_mvar_network(100000, noise_corr, coupling_matrix, time_lag_for_model)
+
+    assert sim_data.shape == (2, 100000)
+
+    cov_err = np.array([[1, noise_corr], [noise_corr, 1]])
+    expected = solve_discrete_lyapunov(coupling_matrix, cov_err)
+    tol = 0.05 * np.abs(expected).max()
+    assert np.abs(np.cov(sim_data) - expected).max() < tol
+
+    lagged = np.cov(sim_data[:, :-time_lag_for_model], sim_data[:, time_lag_for_model:])[2:, :2]
+    assert np.abs(lagged - coupling_matrix @ expected).max() < tol
+
+# ----------------------------------------------------------------------------------
+# assert seeding and inputs of the numpy backend
+# ----------------------------------------------------------------------------------
+def test_mvar_sim_data_numpy_backend():
+
+    data_dict = ds.generate_2node_mvar_data(coupling=0.3, npoints=1000, time_lag_for_model=1,
+                                            noise_corr=0.2, macro_func_mvar=ds.sum_micro_mvar,
+                                            micro_func_mvar=ds.raw_micro_mvar, backend='numpy')
+    assert data_dict['micro'].shape == (2, 1000)
+    assert data_dict['macro'].shape == (1000,)
+
+    coupling_matrix = np.array([[0.3, 0.3], [0.3, 0.3]])
+    sim_data_1 = ds.mvar_sim_data(coupling_matrix, npoints=100, time_lag_for_model=2,
+                                  noise_corr=0.2, backend='numpy', seed=7)
+    sim_data_2 = ds.mvar_sim_data(coupling_matrix, npoints=100, time_lag_for_model=2,
+                                  noise_corr=0.2, backend='numpy', seed=7)
+    sim_data_3 = ds.mvar_sim_data(coupling_matrix, npoints=100, time_lag_for_model=2,
+                                      noise_corr=0.2, backend='numpy', seed=8)
+    assert np.array_equal(sim_data_1, sim_data_2)
+    assert not np.array_equal(sim_data_1, sim_data_3)
+
+    with pt.raises(ValueError):
+        ds.mvar_sim_data(coupling_matrix, npoints=100, time_lag_for_model=1, noise_corr=0.2,
+                         backend='julia')
+    with pt.raises(ValueError):
+        ds.sim_mvar_network(100, 0.2, coupling_matrix, 1, method='W')
+
+# ----------------------------------------------------------------------------------
+# SIM_MVAR_NETWORKS()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the batched simulation equals one simulation per configuration
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_model", [1, 2])
+def test_sim_mvar_networks(time_lag_for_model):
+
+    coupling_matrices = np.array([np.full((2, 2), coupling) for coupling in [0.1, 0.3, 0.45]])
+    noise_corrs = [0.0, 0.5, 0.9]
+    sim_data = ds.sim_mvar_networks(1000, noise_corrs, coupling_matrices, time_lag_for_model)
+
+    assert sim_data.shape == (3, 2, 1000)
+    for config in range(3):
+        expected = ds.sim_mvar_network(1000, noise_corrs[config], coupling_matrices[config],
+                                       time_lag_for_model)
+        assert np.allclose(sim_data[config], expected)
+
+    with pt.raises(ValueError):
+        ds.sim_mvar_networks(1000, noise_corrs[:2], coupling_matrices, time_lag_for_model)
+
+# ----------------------------------------------------------------------------------
+# assert that fully correlated noise (a singular covariance) gives identical nodes
+# ----------------------------------------------------------------------------------
+def test_sim_mvar_network_noise_corr_one():
+
+    coupling_matrix = np.array([[0.3, 0.3], [0.3, 0.3]])
+    sim_data = ds.sim_mvar_network(1000, 1.0, coupling_matrix, 1)
+    assert np.isfinite(sim_data).all()
+    np.testing.assert_allclose(sim_data[0], sim_data[1], atol=1e-12)
+    assert sim_data[0].std() > 1
+
+    # the other configurations of a batch keep their draws
+    sim_data = ds.sim_mvar_networks(1000, [0.5, 1.0], np.array([coupling_matrix] * 2), 1)
+    np.testing.assert_allclose(sim_data[0], ds.sim_mvar_network(1000, 0.5, coupling_matrix, 1))
+    np.testing.assert_allclose(sim_data[1, 0], sim_data[1, 1], atol=1e-12)
+
+def test_generate_2node_mvar_batch():
+
+    configs, data_dicts = ds.generate_2node_mvar_batch(coupling=[0.1, 0.2], noise_corr=[0.0, 0.3, 0.6],
+                                                       npoints=500, time_lag_for_model=1,
+                                                       macro_func_mvar=ds.sum_micro_mvar)
+
+    assert configs == [(0.1, 0.0), (0.1, 0.3), (0.1, 0.6), (0.2, 0.0), (0.2, 0.3), (0.2, 0.6)]
+    assert len(data_dicts) == 6
+    for data_dict in data_dicts:
+        assert data_dict['micro'].shape == (2, 500)
+        assert np.allclose(data_dict['macro'], data_dict['micro'].sum(axis=0))
+
+# ----------------------------------------------------------------------------------
+# MVAR_LAGGED_COVARIANCE() & ANALYTIC MODE
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the analytic lagged covariance solves the model equations
+# ----------------------------------------------------------------------------------
+def test_mvar_lagged_covariance():
+
+    coupling_matrix = np.array([[0.3, 0.1], [0.2, 0.4]])
+    cov_err = np.array([[1, 0.4], [0.4, 1]])
+
+    lagged_cov = ds.mvar_lagged_covariance(coupling_matrix, 0.4, 1, 1)
+    S = lagged_cov[:2, :2]
+    assert np.allclose(coupling_matrix @ S @ coupling_matrix.T + cov_err, S)
+    assert np.allclose(lagged_cov[2:, :2], coupling_matrix @ S)
+
+    # with a model time-lag of 2, X_t and X_t+1 are independent
+    lagged_cov = ds.mvar_lagged_covariance(coupling_matrix, 0.4, 2, 1)
+    assert np.allclose(lagged_cov[2:, :2], 0)
+
+    with pt.raises(ValueError):
+        ds.mvar_lagged_covariance(np.full((2, 2), 0.6), 0.4, 1, 1)
+
+# ----------------------------------------------------------------------------------
+# assert that analytic measures agree with measures of a long simulation
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_model, time_lag_for_measure", [(1, 1), (1, 3), (2, 2)])
+def test_analytic_mode(time_lag_for_model, time_lag_for_measure):
+
+    import complexpy as cp
+
+    model_params = {'coupling': 0.3, 'time_lag_for_model': time_lag_for_model, 'noise_corr': 0.4,
+                    'macro_func_mvar': ds.sum_micro_mvar, 'micro_func_mvar': ds.raw_micro_mvar}
+    analytic_dict = ds.generate_2node_mvar_data(analytic=True, **model_params)
+    data_dict = ds.generate_2node_mvar_data(npoints=200000, backend='numpy', **model_params)
+
+    result_dict = cp.phiid_wpe(analytic_dict, time_lag_for_measure=time_lag_for_measure)
+    expected = cp.phiid_wpe(data_dict, time_lag_for_measure=time_lag_for_measure, average_only=True)
+    for key in expected:
+        assert result_dict[key] == pt.approx(expected[key], abs=5e-3)
+
+    result_dict = cp.shannon_wpe(analytic_dict, time_lag_for_measure=time_lag_for_measure)
+    expected = cp.shannon_wpe(data_dict, time_lag_for_measure=time_lag_for_measure, backend='numpy')
+    for key in expected:
+        assert result_dict[key] == pt.approx(expected[key], abs=5e-3)
+
+    with pt.raises(ValueError):
+        cp.phiid_wpe(analytic_dict, time_lag_for_measure=time_lag_for_measure, red_func='ccs')
@@ -0,0 +1,115 @@
+import sys
+import types
+import numpy as np
+import complexpy.engine as engine
+import pytest as pt
+
+
+@pt.fixture
+def fake_matlab(monkeypatch):
+    # stands in for matlab.engine so that the engine manager can be tested without MATLAB
+    started = []
+
+    class FakeEngine:
+        def __init__(self):
+            self.calls = []
+            self.path = []
+            self.alive = True
+
+        def addpath(self, *paths, nargout=1):
+            self.calls.append('addpath')
+            self.path += paths
+
+        def javaaddpath(self, jar, position, nargout=1):
+            self.calls.append('javaaddpath')
+            self.path.append(jar)
+
+        def exist(self, name, kind=None, nargout=1):
+            if not self.alive:
+                raise RuntimeError('MATLAB process has died')
+            if kind == 'class':
+                return 8 if engine._infodynamics_jar_path in self.path else 0
+            return 2 if any(p.endswith(('phiid', 'shannon_wpe')) for p in self.path) else 0
+
+        def quit(self):
+            started.remove(self)
+
+    def start_matlab():
+        started.append(FakeEngine())
+        return started[-1]
+
+    matlab = types.ModuleType('matlab')
+    matlab.double = lambda initializer: initializer
+    matlab.engine = types.ModuleType('matlab.engine')
+    matlab.engine.start_matlab = start_matlab
+    monkeypatch.setitem(sys.modules, 'matlab', matlab)
+    monkeypatch.setitem(sys.modules, 'matlab.engine', matlab.engine)
+
+    engine.shutdown_engine()
+    yield started
+    engine.shutdown_engine()
+
+# ----------------------------------------------------------------------------------
+# GET_ENGINE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that one engine is started lazily, shared, and shut down
+# ----------------------------------------------------------------------------------
+def test_get_engine_shared(fake_matlab):
+
+    assert not engine.engine_running()
+
+    eng = engine.get_engine()
+    assert engine.get_engine() is eng
+    assert len(fake_matlab) == 1
+
+    engine.shutdown_engine()
+    assert not engine.engine_running()
+    assert len(fake_matlab) == 0
+
+    assert engine.get_engine() is not eng
+    assert len(fake_matlab) == 1
+
+# ----------------------------------------------------------------------------------
+# assert that paths and JIDT are set up once per engine, and dead engines are replaced
+# ----------------------------------------------------------------------------------
+def test_engine_session(fake_matlab):
+
+    assert not engine.engine_healthy()
+
+    eng = engine.get_engine()
+    for _ in range(3):
+        engine.get_engine()
+    assert eng.calls == ['addpath', 'javaaddpath']
+    assert engine.engine_healthy()
+    assert engine.get_engine(check=True) is eng
+
+    eng.alive = False
+    assert not engine.engine_healthy()
+    new_eng = engine.get_engine(check=True)
+    assert new_eng is not eng
+    assert engine.engine_healthy()
+
+# ----------------------------------------------------------------------------------
+# TO_MATLAB() & FROM_MATLAB()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that arrays are passed as contiguous float64 buffers, not as lists
+# ----------------------------------------------------------------------------------
+def test_to_matlab(fake_matlab):
+
+    x = np.arange(12).reshape(3, 4).T
+    mx = engine.to_matlab(x)
+
+    assert isinstance(mx, np.ndarray)
+    assert mx.dtype == np.float64 and mx.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(mx, x)
+
+    assert engine.to_matlab(np.int64(10)) == 10.0
+    assert isinstance(engine.to_matlab(np.int64(10)), float)
+
+    # a buffer-protocol object is viewed, not copied
+    buffer = memoryview(np.ones((2, 3)))
+    assert np.shares_memory(engine.from_matlab(buffer), np.asarray(buffer))
@@ -0,0 +1,350 @@
+import numpy as np
+import complexpy as cp
+import complexpy.phiid as phiid
+import complexpy.gaussian as gaussian
+import complexpy.phiid_discrete as phiid_discrete
+import complexpy.idep as idep
+import pytest as pt
+
+
+@pt.fixture
+def data_dict_test():
+    np.random.seed(1000)
+    data_dict = dict()
+    data_dict['micro'] = np.random.randn(10, 500)
+    data_dict['macro'] = data_dict['micro'].sum(axis=0)
+    return data_dict
+
+# ----------------------------------------------------------------------------------
+# PHIID_FULL()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the native backend reproduces the results of PhiIDFull.m
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_measure, red_func, expected", [(10, 'mmi',
+                                                                   {'rtr': 0.011698997414625658,
+                                                                  'rtx': 7.678718063891419e-17,
+                                                                  'rty': 0.001765050592875013,
+                                                                  'rts': 0.027125354055413997,
+                                                                  'xtr': 0.001765050592875013,
+                                                                  'xtx': 0.022634204439107224,
+                                                                  'xty': -0.001765050592875013,
+                                                                  'xts': -0.015159861003016419,
+                                                                  'ytr': -1.0070434800019268e-16,
+                                                                  'ytx': 1.0070434800019268e-16,
+                                                                  'yty': 0.013284039258620248,
+                                                                  'yts': -0.013284039258620248,
+                                                                  'str': 0.02693853794868931,
+                                                                  'stx': -0.01581906871219834,
+                                                                  'sty': -0.013284039258620248,
+                                                                  'sts': 0.042451941408777866}),
+])
+def test_phiid_full_output(data_dict_test, time_lag_for_measure, red_func, expected):
+
+    atoms, local_atoms = phiid.phiid_full(data_dict_test['micro'], tau=time_lag_for_measure,
+                                          red_func=red_func)
+
+    assert local_atoms.shape == (16, data_dict_test['micro'].shape[1] - time_lag_for_measure)
+    for key in expected:
+        assert atoms[key] == pt.approx(expected[key], abs=1e-12)
+
+# ----------------------------------------------------------------------------------
+# assert that the atoms add up to the time-delayed mutual information
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("red_func", ['mmi', 'ccs'])
+def test_phiid_full_sum_of_atoms(data_dict_test, red_func):
+
+    micro = data_dict_test['micro'][:2]
+    atoms, local_atoms = phiid.phiid_full(micro, tau=1, red_func=red_func)
+
+    S = np.cov(np.vstack([micro[:, :-1], micro[:, 1:]]))
+    tdmi = 0.5 * (np.linalg.slogdet(S[:2, :2])[1] + np.linalg.slogdet(S[2:, 2:])[1]
+                  - np.linalg.slogdet(S)[1])
+    assert sum(atoms.values()) == pt.approx(tdmi)
+
+    with pt.raises(ValueError):
+        phiid.phiid_full(micro, tau=1, red_func='idep')
+    with pt.raises(ValueError):
+        phiid.phiid_full(micro.T, tau=1, red_func=red_func)
+
+# ----------------------------------------------------------------------------------
+# assert that phiid_wpe() gives the same result with the native backend
+# ----------------------------------------------------------------------------------
+def test_phiid_wpe_numpy_backend(data_dict_test):
+
+    result_dict = cp.phiid_wpe(data_dict_test, time_lag_for_measure=1, red_func='mmi',
+                               backend='numpy')
+
+    expected = {'phiid_wpe': 0.03566983858190928, 'phiid_dc': 0.006325381684875102,
+                'phiid_cd': 0.029344456897034178}
+    for key in expected:
+        assert result_dict[key] == pt.approx(expected[key])
+
+    with pt.raises(ValueError):
+        cp.phiid_2sources_2targets(data_dict_test['micro'], backend='julia')
+
+# ----------------------------------------------------------------------------------
+# assert that a list of redundancy functions gives the same atoms as separate calls
+# ----------------------------------------------------------------------------------
+def test_phiid_red_func_list(data_dict_test):
+
+    micro = data_dict_test['micro']
+    atoms, local_atoms = phiid.phiid_full(micro, tau=3, red_func=['mmi', 'ccs'])
+
+    for red_func in ['mmi', 'ccs']:
+        expected_atoms, expected_local_atoms = phiid.phiid_full(micro, tau=3, red_func=red_func)
+        assert atoms[red_func] == expected_atoms
+        np.testing.assert_array_equal(local_atoms[red_func], expected_local_atoms)
+
+        result_dict = cp.phiid_wpe(data_dict_test, time_lag_for_measure=3, red_func=['mmi', 'ccs'],
+                                   backend='numpy')
+        assert result_dict[red_func] == cp.phiid_wpe(data_dict_test, time_lag_for_measure=3,
+                                                     red_func=red_func, backend='numpy')
+
+    with pt.raises(ValueError):
+        phiid.phiid_full(micro, tau=3, red_func=['mmi', 'idep'])
+    with pt.raises(ValueError):
+        cp.phiid_wpe(data_dict_test, red_func=[], backend='numpy')
+
+# ----------------------------------------------------------------------------------
+# assert that the sliding-window mode gives the same result as one call per window
+# ----------------------------------------------------------------------------------
+def test_phiid_wpe_windows(data_dict_test):
+
+    micro = data_dict_test['micro'][:4]
+    result_dict = cp.phiid_wpe({'micro': micro}, time_lag_for_measure=2, red_func=['mmi', 'ccs'],
+                               backend='numpy', window=150, stride=70)
+
+    for red_func in ['mmi', 'ccs']:
+        assert len(result_dict[red_func]['phiid_wpe']) == 6
+        for k, start in enumerate(range(0, 351, 70)):
+            expected = cp.phiid_wpe({'micro': micro[:, start:start + 150]}, time_lag_for_measure=2,
+                                    red_func=red_func, backend='numpy')
+            for key in expected:
+                assert result_dict[red_func][key][k] == pt.approx(expected[key], abs=1e-10)
+
+    with pt.raises(ValueError):
+        cp.phiid_wpe({'micro': micro}, backend='numpy', window=501)
+
+# ----------------------------------------------------------------------------------
+# assert that time-series read chunk by chunk give the same result as in memory
+# ----------------------------------------------------------------------------------
+def test_phiid_wpe_chunked(data_dict_test, tmp_path, monkeypatch):
+
+    micro = data_dict_test['micro'][:4]
+    np.save(tmp_path / 'micro.npy', micro)
+    monkeypatch.setattr(cp.complexpy, '_chunk_size', 64)
+
+    expected = cp.phiid_wpe({'micro': micro}, time_lag_for_measure=3, backend='numpy')
+    for chunked_micro in [tmp_path / 'micro.npy', np.load(tmp_path / 'micro.npy', mmap_mode='r'),
+                          (micro[:, start:start + 37] for start in range(0, 500, 37))]:
+        result_dict = cp.phiid_wpe({'micro': chunked_micro}, time_lag_for_measure=3, backend='numpy')
+        for key in expected:
+            assert result_dict[key] == pt.approx(expected[key], abs=1e-12)
+
+    with pt.raises(ValueError):
+        cp.phiid_wpe({'micro': tmp_path / 'micro.npy'}, backend='matlab')
+    with pt.raises(ValueError):
+        cp.phiid_wpe({'micro': tmp_path / 'micro.npy'}, red_func='ccs', backend='numpy')
+    with pt.raises(ValueError):
+        cp.phiid_wpe({'micro': micro.tolist()}, backend='numpy')
+
+# ----------------------------------------------------------------------------------
+# assert that memory-mapped arrays are used as in-memory arrays where they are not 
+# read chunk by chunk
+# ----------------------------------------------------------------------------------
+def test_phiid_wpe_memmap(data_dict_test, tmp_path, monkeypatch):
+
+    micro = data_dict_test['micro'][:4]
+    np.save(tmp_path / 'micro.npy', micro)
+    memmap_micro = np.load(tmp_path / 'micro.npy', mmap_mode='r')
+
+    # the MATLAB backend (the default) receives the memory-mapped array itself
+    calls = []
+    def fake_phiid_2sources_2targets(micro, time_lag_for_measure, red_func, **kwargs):
+        calls.append((micro, kwargs['backend']))
+        return {r: phiid.phiid_full(micro, tau=time_lag_for_measure, red_func=r)[0] for r in red_func}
+
+    monkeypatch.setattr(cp.complexpy, 'phiid_2sources_2targets', fake_phiid_2sources_2targets)
+    cp.phiid_wpe({'micro': memmap_micro}, time_lag_for_measure=2)
+    assert len(calls) == 1 and isinstance(calls[0][0], np.memmap) and calls[0][1] == 'matlab'
+    monkeypatch.undo()
+
+    for red_func in ['ccs', ['mmi', 'ccs']]:
+        expected = cp.phiid_wpe({'micro': micro}, time_lag_for_measure=2, red_func=red_func, backend='numpy')
+        assert cp.phiid_wpe({'micro': memmap_micro}, time_lag_for_measure=2, red_func=red_func, 
+                            backend='numpy') == expected
+
+# ----------------------------------------------------------------------------------
+# MINIMUM_INFORMATION_BIPARTITION()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that both searches find two independent subsystems, and that the exhaustive 
+# search agrees with a brute-force loop over all bipartitions
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("n_nodes", [4, 7, 20])
+def test_minimum_information_bipartition(n_nodes):
+
+    # two independent autoregressive subsystems (nodes with odd and even index)
+    np.random.seed(n_nodes)
+    A = 0.5 * np.random.rand(n_nodes, n_nodes) / np.sqrt(n_nodes)
+    A[np.add.outer(np.arange(n_nodes), np.arange(n_nodes)) % 2 == 1] = 0
+    X = np.zeros((n_nodes, 2000))
+    for t in range(1, 2000):
+        X[:, t] = A @ X[:, t - 1] + np.random.randn(n_nodes)
+    S = gaussian.lagged_covariance(gaussian.standardize(X), 1)
+
+    expected = (list(range(0, n_nodes, 2)), list(range(1, n_nodes, 2)))
+    assert gaussian.minimum_information_bipartition(S, exhaustive=False) == expected
+    if n_nodes > 16:
+        return
+
+    def score(p1, p2):
+        parts_mi = sum(gaussian.mutual_info(S, p, [i + n_nodes for i in p]) for p in [p1, p2])
+        return (gaussian.mutual_info(S, range(n_nodes), range(n_nodes, 2 * n_nodes)) - parts_mi) / \
+            min(gaussian.entropy(S, p1), gaussian.entropy(S, p2))
+
+    p1, p2 = gaussian.minimum_information_bipartition(S)
+    for mask in range(1, 2 ** (n_nodes - 1)):
+        part = [i for i in range(n_nodes) if mask >> i & 1]
+        assert score(p1, p2) <= score(part, [i for i in range(n_nodes) if i not in part]) + 1e-12
+
+# ----------------------------------------------------------------------------------
+# PHIID_AVERAGE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that closed-form atoms equal the average of the local atoms
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_measure", [1, 10])
+def test_phiid_average_output(data_dict_test, time_lag_for_measure):
+
+    micro = data_dict_test['micro']
+    expected, _ = phiid.phiid_full(micro, tau=time_lag_for_measure, red_func='mmi')
+
+    result_dict = cp.phiid_2sources_2targets(micro, time_lag_for_measure=time_lag_for_measure,
+                                             red_func='mmi', average_only=True)
+    for key in expected:
+        assert result_dict[key] == pt.approx(expected[key], abs=1e-12)
+
+    with pt.raises(ValueError):
+        cp.phiid_2sources_2targets(micro, time_lag_for_measure=time_lag_for_measure,
+                                   red_func='ccs', average_only=True)
+
+# ----------------------------------------------------------------------------------
+# PHIID_LOCAL_ATOMS()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that chunked local atoms equal those of phiid_full(), also as float32 memmap
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("red_func", ['mmi', 'ccs'])
+def test_phiid_local_atoms(data_dict_test, tmp_path, red_func):
+
+    micro = data_dict_test['micro'][:4]
+    _, expected = phiid.phiid_full(micro, tau=2, red_func=red_func)
+
+    local_atoms = phiid.phiid_local_atoms(micro, tau=2, red_func=red_func, chunk_size=64)
+    np.testing.assert_allclose(local_atoms, expected, rtol=1e-12, atol=1e-12)
+
+    atoms = ['str', 'stx', 'sty', 'sts']
+    local_atoms = cp.phiid_2sources_2targets_local(micro, time_lag_for_measure=2, red_func=red_func,
+                                                   backend='numpy', atoms=atoms, dtype=np.float32,
+                                                   out=tmp_path / 'local_atoms.npy')
+    assert isinstance(local_atoms, np.memmap)
+    stored = np.load(tmp_path / 'local_atoms.npy')
+    assert stored.dtype == np.float32 and stored.shape == (4, micro.shape[1] - 2)
+    np.testing.assert_allclose(stored, expected[[phiid.ATOM_NAMES.index(atom) for atom in atoms]],
+                               rtol=1e-5, atol=1e-6)
+
+    with pt.raises(ValueError):
+        phiid.phiid_local_atoms(micro, tau=2, red_func=red_func, atoms=['xyz'])
+
+    # a wrong output array is rejected by both backends (before MATLAB is started)
+    for backend in ['numpy', 'matlab']:
+        for out in [np.empty((4, micro.shape[1] - 1)), np.empty((4, micro.shape[1] - 2), dtype=np.float32)]:
+            with pt.raises(ValueError):
+                cp.phiid_2sources_2targets_local(micro, time_lag_for_measure=2, red_func=red_func,
+                                                 backend=backend, atoms=atoms, out=out)
+
+# ----------------------------------------------------------------------------------
+# PHIID_FULL_DISCRETE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the discrete atoms add up to the plug-in time-delayed mutual information, 
+# that phiid_wpe() gives the same result for a list of redundancy functions, and that
+# time-lags outside [1, T-1] are rejected
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("red_func", ['mmi', 'ccs'])
+def test_phiid_full_discrete(data_dict_test, red_func):
+
+    micro = data_dict_test['micro'][:2]
+    atoms, local_atoms = phiid_discrete.phiid_full_discrete(micro, tau=2, red_func=red_func)
+    assert local_atoms.shape == (16, micro.shape[1] - 2)
+
+    def entropy(x):
+        _, counts = np.unique(x, axis=1, return_counts=True)
+        p = counts / counts.sum()
+        return -np.sum(p * np.log2(p))
+
+    bits = phiid_discrete.binarize(micro)
+    tdmi = entropy(bits[:, :-2]) + entropy(bits[:, 2:]) - entropy(np.vstack([bits[:, :-2], bits[:, 2:]]))
+    assert sum(atoms.values()) == pt.approx(tdmi)
+
+    result_dict = cp.phiid_wpe(data_dict_test, time_lag_for_measure=2, red_func=['mmi', 'ccs'],
+                               backend='numpy', discrete=True)
+    assert result_dict[red_func] == cp.phiid_wpe(data_dict_test, time_lag_for_measure=2,
+                                                 red_func=red_func, backend='numpy', discrete=True)
+
+    with pt.raises(ValueError):
+        phiid_discrete.phiid_full_discrete(micro, red_func='idep')
+    for tau in [0, -1, micro.shape[1], 1.5]:
+        with pt.raises(ValueError):
+            phiid_discrete.phiid_full_discrete(micro, tau=tau, red_func=red_func)
+        with pt.raises(ValueError):
+            phiid_discrete.discrete_mib(phiid_discrete.binarize(micro), tau=tau)
+    with pt.raises(ValueError):
+        cp.phiid_2sources_2targets(micro, red_func=red_func, average_only=True, discrete=True)
+
+# ----------------------------------------------------------------------------------
+# IDEP_DOUBLE_REDUNDANCY()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the outcome probabilities of a batch equal the frequencies of the joint 
+# states of each time-series
+# ----------------------------------------------------------------------------------
+def test_outcome_probabilities(data_dict_test):
+
+    X = (data_dict_test['micro'][:6] > 0).astype(int).reshape(3, 2, -1)
+    p = idep.outcome_probabilities(X, tau=2)
+    assert p.shape == (3, 16)
+
+    for b in range(3):
+        states = [''.join(map(str, s)) for s in np.vstack([X[b, :, :-2], X[b, :, 2:]]).T]
+        expected = [states.count(format(i, '04b')) / len(states) for i in range(16)]
+        np.testing.assert_allclose(p[b], expected)
+        np.testing.assert_array_equal(idep.outcome_probabilities(X[b], tau=2), p[b])
+
+    with pt.raises(ValueError):
+        idep.outcome_probabilities(X + 1, tau=2)
+
+# ----------------------------------------------------------------------------------
+# assert that a copied bit has one bit of double-redundancy, for every copy in a batch
+# ----------------------------------------------------------------------------------
+def test_idep_double_redundancy():
+
+    pt.importorskip('dit')
+
+    p = np.zeros(16)
+    p[[0, 15]] = 0.5
+    assert idep.idep_double_redundancy(p=p) == pt.approx(1, abs=1e-6)
+    np.testing.assert_allclose(idep.idep_double_redundancy(p=np.vstack([p, p])), 1, atol=1e-6)
+
+    with pt.raises(ValueError):
+        idep.idep_double_redundancy(p=2 * p)
+    with pt.raises(ValueError):
+        idep.idep_double_redundancy()
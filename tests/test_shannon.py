@@ -0,0 +1,168 @@
+import numpy as np
+import complexpy as cp
+import complexpy.shannon as shannon
+import pytest as pt
+
+
+@pt.fixture
+def data_dict_test():
+    np.random.seed(1000)
+    data_dict = dict()
+    data_dict['micro'] = np.random.randn(10, 500)
+    data_dict['macro'] = data_dict['micro'].sum(axis=0)
+    return data_dict
+
+# ----------------------------------------------------------------------------------
+# SHANNON_EMERGENCE()
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that the native backend reproduces the results of EmergencePsi.m,
+# EmergenceDelta.m and EmergenceGamma.m
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_measure, expected", [(1, {'shannon_wpe': -0.0075746999352517864,
+                                                             'shannon_dc': -0.0033544310640316564,
+                                                             'shannon_cd': 0.0072812758416552935}),
+                                                       (25, {'shannon_wpe': -0.006368655884905357,
+                                                             'shannon_dc': -0.0035834375888473186,
+                                                             'shannon_cd': 0.011226937782589678})])
+def test_shannon_wpe_numpy_backend(data_dict_test, time_lag_for_measure, expected):
+
+    result_dict = cp.shannon_wpe(data_dict_test, time_lag_for_measure=time_lag_for_measure,
+                                 backend='numpy')
+    for key in expected:
+        assert isinstance(result_dict[key], float)
+        assert result_dict[key] == pt.approx(expected[key])
+
+    with pt.raises(ValueError):
+        cp.shannon_wpe(data_dict_test, time_lag_for_measure=time_lag_for_measure, backend='julia')
+
+# ----------------------------------------------------------------------------------
+# assert that the lagged correlation matches pairwise Pearson correlations
+# ----------------------------------------------------------------------------------
+def test_lagged_correlation(data_dict_test):
+
+    Z = np.column_stack([data_dict_test['micro'].T, data_dict_test['macro']])
+    R = shannon.lagged_correlation(Z, tau=3)
+
+    for i, j in [(0, 0), (2, 7), (10, 4), (10, 10)]:
+        assert R[i, j] == pt.approx(np.corrcoef(Z[:-3, i], Z[3:, j])[0, 1])
+
+# ----------------------------------------------------------------------------------
+# assert that the multi-lag mode gives the same result as one call per time-lag
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lags", [[1, 10, 25], range(1, 6)])
+def test_shannon_wpe_multi_lag(data_dict_test, time_lags):
+
+    result_dicts = cp.shannon_wpe(data_dict_test, time_lag_for_measure=time_lags, backend='numpy')
+
+    assert list(result_dicts) == list(time_lags)
+    for time_lag in time_lags:
+        expected = cp.shannon_wpe(data_dict_test, time_lag_for_measure=time_lag, backend='numpy')
+        for key in expected:
+            assert result_dicts[time_lag][key] == pt.approx(expected[key])
+
+    with pt.raises(ValueError):
+        cp.shannon_wpe(data_dict_test, time_lag_for_measure=[], backend='numpy')
+    with pt.raises(ValueError):
+        cp.shannon_wpe(data_dict_test, time_lag_for_measure=[1, 0], backend='numpy')
+
+# ----------------------------------------------------------------------------------
+# assert that time-lags that leave less than two pairs of samples are rejected (also 
+# before MATLAB is started), instead of giving NaN
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_measure", [499, 500, [1, 499]])
+def test_shannon_wpe_long_lag(data_dict_test, time_lag_for_measure):
+
+    Z = np.column_stack([data_dict_test['micro'].T, data_dict_test['macro']])
+    assert np.isfinite(shannon.lagged_correlations(Z, [1, 498])).all()
+
+    for backend in ['numpy', 'matlab']:
+        with pt.raises(ValueError):
+            cp.shannon_wpe(data_dict_test, time_lag_for_measure=time_lag_for_measure, backend=backend)
+    with pt.raises(ValueError):
+        shannon.lagged_correlations(Z, np.ravel(time_lag_for_measure))
+
+# ----------------------------------------------------------------------------------
+# assert that the sliding-window mode gives the same result as one call per window
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("window, stride", [(100, 1), (120, 45), (50, 60)])
+def test_shannon_wpe_windows(data_dict_test, window, stride):
+
+    result_dict = cp.shannon_wpe(data_dict_test, time_lag_for_measure=3, backend='numpy',
+                                 window=window, stride=stride)
+
+    starts = range(0, 500 - window + 1, stride)
+    assert len(result_dict['shannon_wpe']) == len(starts)
+    for k in [0, len(starts) // 2, len(starts) - 1]:
+        window_dict = {'micro': data_dict_test['micro'][:, starts[k]:starts[k] + window],
+                       'macro': data_dict_test['macro'][starts[k]:starts[k] + window]}
+        expected = cp.shannon_wpe(window_dict, time_lag_for_measure=3, backend='numpy')
+        for key in expected:
+            assert result_dict[key][k] == pt.approx(expected[key], abs=1e-10)
+
+    with pt.raises(ValueError):
+        cp.shannon_wpe(data_dict_test, time_lag_for_measure=3, backend='numpy', window=4)
+    with pt.raises(ValueError):
+        cp.shannon_wpe(data_dict_test, time_lag_for_measure=3, backend='numpy', window=100, stride=0)
+
+# ----------------------------------------------------------------------------------
+# ONLINESHANNONWPE
+# ----------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------
+# assert that chunk-wise updates give the same result as shannon_wpe() on all samples
+# ----------------------------------------------------------------------------------
+@pt.mark.parametrize("time_lag_for_measure, chunk_sizes", [(1, [1, 2, 97, 150, 250]),
+                                                          (25, [10, 10, 200, 280])])
+def test_online_shannon_wpe(data_dict_test, time_lag_for_measure, chunk_sizes):
+
+    estimator = cp.OnlineShannonWPE(time_lag_for_measure=time_lag_for_measure)
+    assert np.isnan(estimator.result()['shannon_wpe'])
+
+    start = 0
+    for chunk_size in chunk_sizes:
+        estimator.update(data_dict_test['micro'][:, start:start + chunk_size],
+                         data_dict_test['macro'][start:start + chunk_size])
+        start += chunk_size
+
+        data_dict = {'micro': data_dict_test['micro'][:, :start], 'macro': data_dict_test['macro'][:start]}
+        if start > 50:
+            expected = cp.shannon_wpe(data_dict, time_lag_for_measure=time_lag_for_measure, backend='numpy')
+            for key in expected:
+                assert estimator.result()[key] == pt.approx(expected[key], abs=1e-10)
+    assert estimator.n_samples == 500
+
+    with pt.raises(ValueError):
+        estimator.update(data_dict_test['micro'][:3, :10], data_dict_test['macro'][:10])
+
+# ----------------------------------------------------------------------------------
+# assert that time-series read chunk by chunk give the same result as in memory
+# ----------------------------------------------------------------------------------
+def test_shannon_wpe_chunked(data_dict_test, tmp_path, monkeypatch):
+
+    np.save(tmp_path / 'micro.npy', data_dict_test['micro'])
+    np.save(tmp_path / 'macro.npy', data_dict_test['macro'])
+    monkeypatch.setattr(cp.complexpy, '_chunk_size', 64)
+
+    expected = cp.shannon_wpe(data_dict_test, time_lag_for_measure=[1, 25], backend='numpy')
+    result_dicts = cp.shannon_wpe({'micro': tmp_path / 'micro.npy', 'macro': tmp_path / 'macro.npy'},
+                                  time_lag_for_measure=[1, 25], backend='numpy')
+    for time_lag in [1, 25]:
+        for key in expected[time_lag]:
+            assert result_dicts[time_lag][key] == pt.approx(expected[time_lag][key], abs=1e-12)
+
+    with pt.raises(ValueError):
+        cp.shannon_wpe({'micro': tmp_path / 'micro.npy', 'macro': tmp_path / 'macro.npy'},
+                       backend='numpy', window=100)
+    with pt.raises(ValueError):
+        cp.shannon_wpe({'micro': data_dict_test['micro'].tolist(), 'macro': data_dict_test['macro']},
+                       backend='numpy')
+
+    # with a window, memory-mapped arrays are used as in-memory arrays
+    memmap_dict = {'micro': np.load(tmp_path / 'micro.npy', mmap_mode='r'),
+                   'macro': np.load(tmp_path / 'macro.npy', mmap_mode='r')}
+    expected = cp.shannon_wpe(data_dict_test, backend='numpy', window=100, stride=50)
+    result_dict = cp.shannon_wpe(memmap_dict, backend='numpy', window=100, stride=50)
+    for key in expected:
+        np.testing.assert_allclose(result_dict[key], expected[key], rtol=1e-12)